@@ -0,0 +1,85 @@
+"""Typed vs dict decoding of a full-size river race log.
+
+Run from the repo root:
+
+    python -m benchmarks.bench_decode
+
+Builds a synthetic /riverracelog body (10 wars x 5 clans x 50 participants,
+with the fields the real API sends) and compares:
+
+- dict:  ``json.loads`` into dicts (what the client cached before), then WarHistory
+- typed: ``msgspec`` straight into ``services.schemas.RaceLog``, then WarHistory
+
+reporting decode time and the memory held by the decoded (cached) object,
+plus the cost of a WarHistory indexing every clan vs only its own.
+"""
+
+import json
+import timeit
+import tracemalloc
+
+import msgspec
+
+from services.clash_royale import WarHistory
+from services.schemas import RaceLog
+
+WARS, CLANS, PARTICIPANTS = 10, 5, 50
+RUNS = 50
+
+
+def race_log_body() -> bytes:
+    items = []
+    for war in range(WARS):
+        standings = []
+        for clan in range(CLANS):
+            participants = [
+                {"tag": f"#P{clan}{i:03}", "name": f"Player {clan}-{i}", "fame": 100 * i, "repairPoints": 0,
+                 "boatAttacks": 1, "decksUsed": 16, "decksUsedToday": 4}
+                for i in range(PARTICIPANTS)
+            ]
+            standings.append({
+                "rank": clan + 1,
+                "trophyChange": 20 - 10 * clan,
+                "clan": {"tag": f"#C{clan}", "name": f"Clan {clan}", "badgeId": 16000000 + clan, "fame": 10000,
+                         "repairPoints": 0, "finishTime": "20260101T100000.000Z", "participants": participants,
+                         "periodPoints": 0, "clanScore": 4000},
+            })
+        items.append({"seasonId": 120, "sectionIndex": war, "createdDate": "20260101T100000.000Z",
+                      "standings": standings})
+    return json.dumps({"items": items}).encode()
+
+
+def retained_bytes(build) -> int:
+    tracemalloc.start()
+    obj = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del obj
+    return size
+
+
+def main() -> None:
+    body = race_log_body()
+    decoder = msgspec.json.Decoder(RaceLog)
+
+    paths = {
+        "dict": lambda: json.loads(body),
+        "typed": lambda: decoder.decode(body),
+    }
+    print(f"race log body: {len(body) / 1024:.0f} KiB ({WARS} wars x {CLANS} clans x {PARTICIPANTS} participants)")
+    for name, decode in paths.items():
+        seconds = timeit.timeit(decode, number=RUNS) / RUNS
+        print(f"{name:>6}: decode {seconds * 1000:6.2f} ms, cached object {retained_bytes(decode) / 1024:7.0f} KiB")
+
+    # WarHistory construction, the per-command cost on top of a cache hit.
+    typed = decoder.decode(body)
+    for label, clan_tag in (("all clans", None), ("own clan", "#C0")):
+        def build(clan_tag=clan_tag):
+            return WarHistory(typed.items, clan_tag)
+        seconds = timeit.timeit(build, number=RUNS) / RUNS
+        size = retained_bytes(build)
+        print(f"WarHistory from typed log, {label}: {seconds * 1000:.2f} ms, {size / 1024:.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,32 +8,46 @@ from discord.ext import commands
 from config import Config
 from db.database import Database
 from db.repository import Repository
+from db.response_cache import ResponseCache
 from errors import BotError
-from services.clash_royale import ClashRoyaleClient
+from services.clash_royale import STALE_GRACE, ClashRoyaleClient
+from services.deadline import INTERACTIVE_BUDGET, start_deadline
 from services.deck_ai import DeckAIClient
+from services.tag_memo import TagMemo
 
 logger = logging.getLogger(__name__)
 
 
+class BudgetedCommandTree(app_commands.CommandTree):
+    """Gives every slash command ``INTERACTIVE_BUDGET`` seconds for its API calls."""
+
+    async def interaction_check(self, interaction: Interaction) -> bool:
+        # Runs in the same task as the command callback, so the deadline covers the whole command.
+        start_deadline(INTERACTIVE_BUDGET)
+        return True
+
+
 class ClashBot(commands.Bot):
     """Bot with shared service clients and repository attached
 
     Cogs reach these through ``interaction.client`` / ``self.bot``:
     ``bot.cr`` (Clash Royale API), ``bot.deckai`` (DeckAI API),
-    ``bot.repo`` (database).
+    ``bot.repo`` (database), ``bot.tag_memo`` (clan-tag resolution memo).
     """
 
     def __init__(self, config: Config):
         intents = discord.Intents.default()
         intents.message_content = True
         intents.members = True
-        super().__init__(command_prefix="/", intents=intents)
+        super().__init__(command_prefix="/", intents=intents, tree_cls=BudgetedCommandTree)
         self.config = config
         self.session: aiohttp.ClientSession | None = None
         self.db: Database | None = None
         self.repo: Repository | None = None
+        self.response_cache: ResponseCache | None = None
         self.cr: ClashRoyaleClient | None = None
         self.deckai: DeckAIClient | None = None
+        self.tag_memo = TagMemo(config.tag_memo_ttl)
         self._synced = False
 
     async def setup_hook(self) -> None:
@@ -41,8 +55,24 @@ class ClashBot(commands.Bot):
         self.db = Database(self.config.database_path)
         connection = await self.db.connect()
         self.repo = Repository(connection)
-        self.cr = ClashRoyaleClient(self.session, self.config.clash_royale_api_key)
-        self.deckai = DeckAIClient(self.session, self.config.deckai_api_key)
+        self.response_cache = ResponseCache(
+            self.config.response_cache_path,
+            self.config.response_cache_max_bytes,
+            keep_expired_for=STALE_GRACE,
+        )
+        await self.response_cache.connect()
+        self.cr = ClashRoyaleClient(
+            self.session,
+            self.config.clash_royale_api_keys,
+            requests_per_second=self.config.clash_royale_rate_limit,
+            disk_cache=self.response_cache,
+            cache_max_bytes=self.config.memory_cache_max_bytes,
+        )
+        self.deckai = DeckAIClient(
+            self.session,
+            self.config.deckai_api_key,
+            requests_per_second=self.config.deckai_rate_limit,
+        )
 
         self.tree.on_error = self.on_app_command_error
 
@@ -67,10 +97,15 @@ class ClashBot(commands.Bot):
 
     async def close(self) -> None:
         await super().close()
+        for client in (self.cr, self.deckai):
+            if client is not None:
+                await client.aclose()  # flush pending response-cache writes before the cache closes
         if self.session is not None:
             await self.session.close()
         if self.db is not None:
             await self.db.close()
+        if self.response_cache is not None:
+            await self.response_cache.close()
 
     async def on_app_command_error(self, interaction: Interaction, error: app_commands.AppCommandError) -> None:
         if isinstance(error, app_commands.CommandInvokeError):
@@ -5,9 +5,10 @@ from discord.ui import Button, Select, View
 
 from cogs.resolvers import resolve_clan_tag
 from cogs.war import send_fame_stats
-from services.clash_royale import ROLE_DISPLAY, former_member_tags
+from services.clash_royale import ROLE_DISPLAY, members_of
+from services.http import accept_stale
 from services.scoring import MemberScore, score_members
-from ui.embeds import make_embed
+from ui.embeds import add_as_of_note, make_embed
 from ui.emojis import FAME_EMOJI, NEW_MEMBER_EMOJI
 from ui.views import DownloadCSVButton
 
@@ -87,8 +88,10 @@ class ClanTableView(View):
 
     async def refresh(self, interaction: Interaction):
         await interaction.response.defer()
-        rows = await self.cog.fetch_clan_rows(self.clan_tag)
+        with accept_stale() as freshness:
+            rows = await self.cog.fetch_clan_rows(self.clan_tag)
         embed = self.cog.build_clan_embed(self.clan_tag, rows, self.listing_order, self.data_order)
+        add_as_of_note(embed, freshness.as_of)
         self.update_csv(rows)
         await interaction.edit_original_response(embed=embed, view=self)
 
@@ -146,14 +149,16 @@ class ClanCog(commands.Cog):
     # ---- /clan ----
 
     async def fetch_clan_rows(self, clan_tag: str) -> list[dict]:
-        members = await self.bot.cr.clan_members(clan_tag)
-        history = await self.bot.cr.river_race_log(clan_tag)
+        snapshot = await self.bot.cr.clan_snapshot(clan_tag, race=False)
+        tags = [member.tag for member in snapshot.members]
+        weeks = snapshot.history.weeks_in_clan_of(tags).tolist()
+        fame = snapshot.history.average_fame_of(tags).tolist()
         rows = []
-        for member in members:
+        for member, member_weeks, member_fame in zip(snapshot.members, weeks, fame, strict=True):
             rows.append({
                 "name": member.name,
-                "weeks": history.weeks_in_clan(member.tag),
-                "fame": history.average_fame(member.tag),
+                "weeks": member_weeks,
+                "fame": member_fame,
                 "discord_id": await self.bot.repo.discord_id_for_tag(member.tag),
             })
         return rows
@@ -196,9 +201,11 @@ class ClanCog(commands.Cog):
     async def clan(self, interaction: Interaction, clan_tag: str):
         await interaction.response.defer()
         tag = await resolve_clan_tag(interaction, clan_tag)
-        rows = await self.fetch_clan_rows(tag)
+        with accept_stale() as freshness:
+            rows = await self.fetch_clan_rows(tag)
         view = ClanTableView(self, tag)
         embed = self.build_clan_embed(tag, rows, view.listing_order, view.data_order)
+        add_as_of_note(embed, freshness.as_of)
         view.update_csv(rows)
         await interaction.followup.send(embed=embed, view=view)
 
@@ -206,26 +213,23 @@ class ClanCog(commands.Cog):
 
     async def fetch_member_rows(self, clan_tag: str, view_mode: str) -> tuple[str, list[dict]]:
         if view_mode == "former":
-            race = await self.bot.cr.current_river_race(clan_tag)
-            members = await self.bot.cr.clan_members(clan_tag)
-            former = former_member_tags(race, members)
+            snapshot = await self.bot.cr.clan_snapshot(clan_tag, war_log=False)
             return "Former Members", [
                 {"tag": tag, "name": name, "role": "former", "is_new": False}
-                for tag, name in former.items()
+                for tag, name in snapshot.former.items()
             ]
 
-        clan = await self.bot.cr.clan(clan_tag)
-        members = await self.bot.cr.clan_members(clan_tag)
-        history = await self.bot.cr.river_race_log(clan_tag)
+        snapshot = await self.bot.cr.clan_snapshot(clan_tag, race=False)
+        history = snapshot.history
         rows = [
             {"tag": m.tag, "name": m.name, "role": m.role, "is_new": history.is_new_member(m.tag)}
-            for m in members
+            for m in snapshot.members
         ]
         if view_mode == "new":
             rows = [r for r in rows if r["is_new"]]
         elif view_mode == "none":
             rows = [r for r in rows if not r["is_new"]]
-        return clan["name"], rows
+        return snapshot.name, rows
 
     @app_commands.command(name="members", description="Get information about the current members of a clan")
     @app_commands.describe(clan_tag="The tag of the clan (or a server nickname)")
@@ -233,8 +237,9 @@ class ClanCog(commands.Cog):
         await interaction.response.defer()
         tag = await resolve_clan_tag(interaction, clan_tag)
         view = MembersTableView(self, tag)
-        clan_name, rows = await self.fetch_member_rows(tag, view.view_mode)
-        embed = view.build_embed(clan_name, rows)
+        with accept_stale() as freshness:
+            clan_name, rows = await self.fetch_member_rows(tag, view.view_mode)
+        embed = add_as_of_note(view.build_embed(clan_name, rows), freshness.as_of)
         view.update_csv(rows)
         await interaction.followup.send(embed=embed, view=view)
 
@@ -245,12 +250,11 @@ class ClanCog(commands.Cog):
         await interaction.response.defer()
         clan_tag = await resolve_clan_tag(interaction, clan)
 
-        clan_info = await self.bot.cr.clan(clan_tag)
-        members = await self.bot.cr.clan_members(clan_tag)
-        history = await self.bot.cr.river_race_log(clan_tag)
+        snapshot = await self.bot.cr.clan_snapshot(clan_tag, race=False)
+        members = snapshot.members
 
         roles = {m.tag: m.role for m in members}
-        scores = score_members(members, history)
+        scores = score_members(members, snapshot.history)
         eligible = [s for s in scores if s.total is not None]
         if exclude_leadership:
             eligible = [s for s in eligible if roles.get(s.tag) not in ("coLeader", "leader")]
@@ -259,7 +263,7 @@ class ClanCog(commands.Cog):
 
         kind = "promotion" if promote else "kick"
         embed = make_embed(
-            f"{'Promotion' if promote else 'Kick'} Recommendations for {clan_info['name']} (#{clan_tag})",
+            f"{'Promotion' if promote else 'Kick'} Recommendations for {snapshot.name} (#{clan_tag})",
             f"Here are the top {min(n, len(eligible))} members "
             f"{'who might deserve a promotion' if promote else 'recommended for removal'}:",
         )
@@ -326,14 +330,14 @@ class ClanCog(commands.Cog):
         await interaction.response.defer()
         tag = await resolve_clan_tag(interaction, clan_tag)
         clan = await self.bot.cr.clan(tag)
-        members = await self.bot.cr.clan_members(tag)
+        members = members_of(clan)
 
         lines = []
         for member in members:
             discord_id = await self.bot.repo.discord_id_for_tag(member.tag)
             lines.append(f"<@{discord_id}>" if discord_id else f"`{member.name}`")
 
-        message = f"**Members of {clan['name']} (#{tag}):**\n\n" + "\n".join(lines)
+        message = f"**Members of {clan.name} (#{tag}):**\n\n" + "\n".join(lines)
         await interaction.followup.send(
             message[:2000],
             allowed_mentions=discord.AllowedMentions(users=[]),
@@ -451,7 +455,8 @@ class MembersTableView(View):
 
     async def refresh(self, interaction: Interaction):
         await interaction.response.defer()
-        clan_name, rows = await self.cog.fetch_member_rows(self.clan_tag, self.view_mode)
-        embed = self.build_embed(clan_name, rows)
+        with accept_stale() as freshness:
+            clan_name, rows = await self.cog.fetch_member_rows(self.clan_tag, self.view_mode)
+        embed = add_as_of_note(self.build_embed(clan_name, rows), freshness.as_of)
         self.update_csv(rows)
         await interaction.edit_original_response(embed=embed, view=self)
@@ -8,8 +8,9 @@ from discord.ui import Button, Modal, Select, TextInput, View
 
 from cogs.checks import is_privileged, user_is_privileged
 from db.repository import MAX_LINKED_TAGS
-from errors import BotError, ClanNotFound
-from services.clash_royale import normalize_tag
+from errors import BotError, ClanNotFound, InvalidPlayerTag
+from services.schemas import PlayerSummary
+from services.tags import is_valid_tag, normalize_tag
 from ui.embeds import EMBED_COLOR, MAX_DESCRIPTION, make_embed
 from ui.emojis import TROPHYROAD_EMOJI
 from ui.views import ConfirmView
@@ -71,16 +72,10 @@ class LinkPanel(View):
         """Rebuild the panel embed from the database and sync button states."""
         self.tags = await bot.repo.player_tags(self.target.id)
 
-        async def fetch(tag: str) -> dict | None:
-            try:
-                return await bot.cr.player(tag)
-            except Exception:
-                return None
-
-        players = await asyncio.gather(*[fetch(tag) for tag in self.tags])
+        players = [result.value for result in await bot.cr.map_concurrent(bot.cr.player, self.tags)]
         deckai_ids = await asyncio.gather(*[bot.repo.deckai_id(tag) for tag in self.tags])
         self.names = {
-            tag: (player or {}).get("name", "Unknown")
+            tag: player.name if player else "Unknown"
             for tag, player in zip(self.tags, players, strict=True)
         }
 
@@ -98,8 +93,8 @@ class LinkPanel(View):
             for index, (tag, player, deckai_id) in enumerate(rows, 1):
                 if index == 2:
                     sections.append(f"__**Alt Accounts ({len(self.tags) - 1})**__")
-                name = (player or {}).get("name", "Unknown")
-                trophies = (player or {}).get("trophies", "?")
+                name = player.name if player else "Unknown"
+                trophies = player.trophies if player else "?"
                 deckai = f"`{deckai_id}`" if deckai_id else "*not set*"
                 sections.append(
                     f"**{index}. [{name}](https://royaleapi.com/player/{tag})** `#{tag}`\n"
@@ -220,6 +215,8 @@ class TagModal(Modal):
         await interaction.response.defer(ephemeral=True, thinking=True)
         bot = interaction.client
         tag = normalize_tag(self.player_tag.value)
+        if not is_valid_tag(tag):
+            raise InvalidPlayerTag()
         player = await bot.cr.player(tag)  # raises PlayerNotFound -> on_error
 
         result = await bot.repo.link_player_tag(self.panel.target.id, tag, alt=self.alt)
@@ -246,7 +243,7 @@ class TagModal(Modal):
         await self.panel.refresh(bot)
         kind = "an alt account on" if self.alt else "the main account on"
         await interaction.followup.send(
-            f"✅ **{player.get('name', 'Unknown')}** `#{tag}`{deckai_note} is now {kind} "
+            f"✅ **{player.name}** `#{tag}`{deckai_note} is now {kind} "
             f"{self.panel.possessive()}.",
             ephemeral=True,
         )
@@ -328,13 +325,7 @@ class LinksCog(commands.Cog):
             await interaction.followup.send("No player tags linked.")
             return
 
-        async def fetch(tag: str) -> dict | None:
-            try:
-                return await self.bot.cr.player(tag)
-            except Exception:
-                return None
-
-        players = await asyncio.gather(*[fetch(tag) for tag in player_tags])
+        players = [result.value for result in await self.bot.cr.map_concurrent(self.bot.cr.player, player_tags)]
         if all(p is None for p in players):
             raise BotError("Failed to fetch player data. Please try again later.")
 
@@ -352,13 +343,13 @@ class LinksCog(commands.Cog):
             for index, (tag, player) in enumerate(chunk, start + 1):
                 if player is None:
                     continue
-                clan = player.get("clan", {})
-                clan_tag = clan.get("tag", "").replace("#", "")
-                role = _format_role(player.get("role") or "member")
+                clan_tag = player.clan.tag.replace("#", "") if player.clan else ""
+                clan_name = player.clan.name if player.clan else "No Clan"
+                role = _format_role(player.role or "member")
                 accounts += (
-                    f"**{index}. [{player.get('name', 'Unknown')}](https://royaleapi.com/player/{tag})** #{tag}\n"
-                    f"{TROPHYROAD_EMOJI} {player.get('trophies', 0)}\n"
-                    f"{role} of [{clan.get('name', 'No Clan')}](https://royaleapi.com/clan/{clan_tag})\n\n"
+                    f"**{index}. [{player.name}](https://royaleapi.com/player/{tag})** #{tag}\n"
+                    f"{TROPHYROAD_EMOJI} {player.trophies}\n"
+                    f"{role} of [{clan_name}](https://royaleapi.com/clan/{clan_tag})\n\n"
                 )
             if accounts:
                 embed.add_field(name=f"Player Accounts ({len(chunk)})", value=accounts.strip(), inline=False)
@@ -411,6 +402,8 @@ class LinksCog(commands.Cog):
         if len(nickname) >= 5:
             raise BotError("Nickname must be less than 5 characters.")
 
+        if not is_valid_tag(tag):
+            raise BotError("The clan tag is not valid.")
         try:
             await self.bot.cr.clan(tag)
         except ClanNotFound:
@@ -429,6 +422,7 @@ class LinksCog(commands.Cog):
 
             if confirm.confirmed:
                 await self.bot.repo.set_clan_nickname(tag, guild_id, nickname)
+                self.bot.tag_memo.forget_guild(guild_id)
                 result = make_embed("Nickname Updated",
                                     f"The nickname for clan tag `{tag}` has been updated to `{nickname}`.",
                                     color=0x00FF00)
@@ -442,6 +436,7 @@ class LinksCog(commands.Cog):
             return
 
         await self.bot.repo.set_clan_nickname(tag, guild_id, nickname)
+        self.bot.tag_memo.forget_guild(guild_id)
         await interaction.response.send_message(
             f"Clan tag {tag} linked with nickname '{nickname}' in this server."
         )
@@ -466,6 +461,7 @@ class LinksCog(commands.Cog):
 
         if confirm.confirmed:
             deleted = await self.bot.repo.delete_clan_nickname(clan_tag, guild_id)
+            self.bot.tag_memo.forget_guild(guild_id)
             if deleted:
                 result = make_embed("Nickname Deleted",
                                     f"The nickname `{existing}` for clan tag `{clan_tag}` has been "
@@ -498,14 +494,8 @@ class LinksCog(commands.Cog):
         links.sort(key=lambda link: link[1].lower())
 
         # Fetch clan names concurrently; a failed lookup falls back to the tag.
-        async def _clan_name(clan_tag: str) -> str | None:
-            try:
-                clan = await self.bot.cr.clan(clan_tag)
-                return clan.get("name")
-            except Exception:
-                return None
-
-        names = await asyncio.gather(*(_clan_name(tag) for tag, _ in links))
+        clans = await self.bot.cr.map_concurrent(self.bot.cr.clan, [tag for tag, _ in links])
+        names = [clan.value.name or None if clan.ok else None for clan in clans]
 
         # Render one line per clan into the embed description (up to 4096 chars),
         # rather than one field per clan (Discord caps embeds at 25 fields).
@@ -533,20 +523,26 @@ class LinksCog(commands.Cog):
 
 
 class ProfileView(View):
-    def __init__(self, player_tags: list[str], players: list[dict | None], embeds: list[discord.Embed]):
+    def __init__(self, player_tags: list[str], players: list[PlayerSummary | None], embeds: list[discord.Embed]):
         super().__init__(timeout=600)
         self.embeds = embeds
         self.page = 0
 
         options = [
-            SelectOption(label=f"{(player or {}).get('name', 'Unknown')} (#{tag})", value=tag)
+            SelectOption(label=f"{player.name if player else 'Unknown'} (#{tag})", value=tag)
             for tag, player in zip(player_tags, players, strict=True)
         ]
+        clan_hints = {
+            tag: player.clan.tag
+            for tag, player in zip(player_tags, players, strict=True)
+            if player is not None and player.clan is not None
+        }
         select = Select(placeholder="Select an account to view more info", options=options)
 
         async def on_select(interaction: Interaction):
             from cogs.misc import send_player_embed
-            await send_player_embed(interaction, select.values[0])
+            tag = select.values[0]
+            await send_player_embed(interaction, tag, clan_hints.get(tag))
 
         select.callback = on_select
         self.add_item(select)
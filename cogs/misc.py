@@ -6,9 +6,10 @@ from discord.ext import commands
 from discord.ui import Select, View
 
 from cogs.resolvers import resolve_player_tag
-from errors import NoDeckAILink, NotLinked
-from services.clash_royale import normalize_tag, race_participants
+from errors import InvalidPlayerTag, NoDeckAILink, NotLinked, TournamentNotFound
 from services.deck_ai import DeckRecommendation, recommend_deck, split_available_decks
+from services.schemas import PathOfLegendResult
+from services.tags import is_valid_tag, normalize_tag
 from ui.embeds import excel_like_sort_key, make_embed
 from ui.emojis import (
     CC_EMOJI,
@@ -32,38 +33,31 @@ DEVELOPER_ID = 880093108153495563
 
 # ---- /player ----
 
-async def send_player_embed(interaction: Interaction, player_tag: str):
-    """Detailed player embed; shared by /player and the /profile account select."""
+async def send_player_embed(interaction: Interaction, player_tag: str, clan_hint: str | None = None):
+    """Detailed player embed; shared by /player and the /profile account select.
+
+    ``clan_hint`` is the clan the caller believes the player is in, so its
+    race data can be fetched alongside the player.
+    """
     if not interaction.response.is_done():
         await interaction.response.defer()
 
     bot = interaction.client
-    tag = normalize_tag(player_tag)
-    player = await bot.cr.player(tag)
-
-    clan_info = player.get("clan")
-    current_fame = last_fame = current_decks = last_decks = 0
-    if clan_info:
-        clan_tag = clan_info["tag"]
-        race = await bot.cr.current_river_race(clan_tag)
-        history = await bot.cr.river_race_log(clan_tag)
-        participant = race_participants(race).get(tag, {})
-        current_fame = int(participant.get("fame", 0))
-        current_decks = int(participant.get("decksUsed", 0))
-        last_fame = history.fame(tag, 1)
-        last_decks = history.decks_used(tag, 1)
+    dossier = await bot.cr.player_dossier(player_tag, clan_hint)
+    tag, player, clan_info = dossier.tag, dossier.player, dossier.player.clan
+    current_fame, current_decks, last_fame, last_decks = dossier.war_stats()
 
     embed = make_embed(
-        f"{player.get('name', '')} #{tag} {LEVEL_EMOJIS.get(player.get('expLevel', 0), '')}"
+        f"{player.name} #{tag} {LEVEL_EMOJIS.get(player.exp_level, '')}"
     )
     embed.url = f"https://royaleapi.com/player/{tag}"
 
     if clan_info:
-        nohash_clan_tag = clan_info["tag"].strip("#")
-        role = (player.get("role") or "").capitalize()
+        nohash_clan_tag = clan_info.tag.strip("#")
+        role = player.role.capitalize()
         embed.add_field(
             name="**__Clan__**",
-            value=f"[{clan_info.get('name', 'No Clan')}](<https://royaleapi.com/clan/{nohash_clan_tag}>) "
+            value=f"[{clan_info.name}](<https://royaleapi.com/clan/{nohash_clan_tag}>) "
                   f"#{nohash_clan_tag} ({role})",
             inline=True,
         )
@@ -72,47 +66,36 @@ async def send_player_embed(interaction: Interaction, player_tag: str):
 
     embed.add_field(
         name="**__Trophy Road__**",
-        value=f"Current: {TROPHYROAD_EMOJI} {player.get('trophies', 0)}\n"
-              f"Best: {TROPHYROAD_EMOJI} {player.get('bestTrophies', 0)}",
+        value=f"Current: {TROPHYROAD_EMOJI} {player.trophies}\n"
+              f"Best: {TROPHYROAD_EMOJI} {player.best_trophies}",
         inline=False,
     )
 
-    cards = player.get("cards", [])
-    evolution_cards = [c for c in cards if c.get("evolutionLevel", 0) == 1]
-    max_cards = [c for c in cards if c.get("level") == c.get("maxLevel", 0)]
-    max_minus_1 = [c for c in cards if c.get("level") == c.get("maxLevel", 0) - 1]
-    max_minus_2 = [c for c in cards if c.get("level") == c.get("maxLevel", 0) - 2]
     embed.add_field(
         name="**__Card Levels__**",
         value=(
-            f"{EVOLUTION_EMOJI}: {len(evolution_cards)}\n"
-            f"{LEVEL_16_EMOJI}: {len(max_cards)}\n"
-            f"{LEVEL_15_EMOJI}: {len(max_minus_1)}\n"
-            f"{LEVEL_14_EMOJI}: {len(max_minus_2)}"
+            f"{EVOLUTION_EMOJI}: {player.evolutions}\n"
+            f"{LEVEL_16_EMOJI}: {player.max_level_cards}\n"
+            f"{LEVEL_15_EMOJI}: {player.max_minus_1_cards}\n"
+            f"{LEVEL_14_EMOJI}: {player.max_minus_2_cards}"
         ),
         inline=False,
     )
 
-    ranked_current = player.get("currentPathOfLegendSeasonResult", {})
-    ranked_best = player.get("bestPathOfLegendSeasonResult", {})
+    ranked_current, ranked_best = player.ranked_current, player.ranked_best
     if ranked_current or ranked_best:
         embed.add_field(
             name="**__Ranked__**",
             value=f"Current: {_format_ranked_entry(ranked_current)}\nBest: {_format_ranked_entry(ranked_best)}",
             inline=False,
         )
-        league = _league_number(ranked_current)
+        league = ranked_current.league_number if ranked_current else None
         if league and league in LEAGUE_IMAGES:
             embed.set_thumbnail(url=LEAGUE_IMAGES[league])
 
-    badges = player.get("badges", [])
-
-    def badge_progress(badge_name: str) -> str:
-        return str(next((b.get("progress", "0") for b in badges if b.get("name") == badge_name), "0"))
-
-    embed.add_field(name="**__CW2 Wins__**", value=f"{CW2_EMOJI} {badge_progress('ClanWarWins')}", inline=True)
-    embed.add_field(name="**__CC Wins__**", value=f"{CC_EMOJI} {badge_progress('Classic12Wins')}", inline=True)
-    embed.add_field(name="**__GC Wins__**", value=f"{GC_EMOJI} {badge_progress('Grand12Wins')}", inline=True)
+    embed.add_field(name="**__CW2 Wins__**", value=f"{CW2_EMOJI} {player.clan_war_wins}", inline=True)
+    embed.add_field(name="**__CC Wins__**", value=f"{CC_EMOJI} {player.classic_challenge_wins}", inline=True)
+    embed.add_field(name="**__GC Wins__**", value=f"{GC_EMOJI} {player.grand_challenge_wins}", inline=True)
 
     embed.add_field(
         name="**__Current War Stats__**",
@@ -128,19 +111,11 @@ async def send_player_embed(interaction: Interaction, player_tag: str):
     await interaction.followup.send(embed=embed)
 
 
-def _league_number(ranked_entry: dict) -> int | None:
-    try:
-        league = ranked_entry.get("leagueNumber")
-        return int(league) if league is not None else None
-    except (ValueError, TypeError):
-        return None
-
-
-def _format_ranked_entry(ranked_entry: dict) -> str:
-    league = _league_number(ranked_entry)
+def _format_ranked_entry(ranked_entry: PathOfLegendResult | None) -> str:
+    league = ranked_entry.league_number if ranked_entry else None
     if league is not None and league >= 7:
-        display = f"{RANKED_MEDAL_EMOJI} {ranked_entry.get('trophies', 0)}"
-        rank = ranked_entry.get("rank")
+        display = f"{RANKED_MEDAL_EMOJI} {ranked_entry.trophies}"
+        rank = ranked_entry.rank
         if rank is not None:
             display += f" (Rank: #{rank})"
         return display
@@ -474,6 +449,8 @@ class MiscCog(commands.Cog):
     async def rankings(self, interaction: Interaction, tourny_tag: str):
         await interaction.response.defer()
         tag = normalize_tag(tourny_tag)
+        if not is_valid_tag(tag):
+            raise TournamentNotFound()
         name, players = await self.bot.cr.tournament(tag)
         view = RankingsView(self, tag)
         embed = view.render(name, players)
@@ -491,6 +468,8 @@ class MiscCog(commands.Cog):
         await interaction.response.defer()
 
         opponent_tag = normalize_tag(opponent_player_tag)
+        if not is_valid_tag(opponent_tag):
+            raise InvalidPlayerTag()
         target_user = someone_else or interaction.user
 
         player_tags = await self.bot.repo.player_tags(target_user.id)
@@ -27,12 +27,17 @@ from discord.ui import Button, Modal, TextInput, View
 
 from cogs.checks import is_privileged
 from cogs.resolvers import resolve_clan_tag
-from ui.embeds import EMBED_COLOR, ERROR_COLOR, MAX_DESCRIPTION, SUCCESS_COLOR, make_embed
+from services.deadline import BACKGROUND_BUDGET, deadline
+from services.http import accept_stale
+from services.ratelimit import Priority, request_priority
+from services.schemas import Clan
+from ui.embeds import EMBED_COLOR, ERROR_COLOR, MAX_DESCRIPTION, SUCCESS_COLOR, add_as_of_note, make_embed
 
 logger = logging.getLogger(__name__)
 
 CLAN_MAX_MEMBERS = 50
 POLL_INTERVAL_SECONDS = 300  # 5 minutes
+STATS_LOG_INTERVAL_SECONDS = 3600  # API client stats go to the log at most this often
 
 
 def _recruits(n: int) -> str:
@@ -76,8 +81,8 @@ async def render_needs_message(interaction: Interaction, guild_id: int, clan_tag
     """
     try:
         clan = await interaction.client.cr.clan(clan_tag)
-        name = clan.get("name") or f"#{clan_tag}"
-        count = clan.get("members")
+        name = clan.name or f"#{clan_tag}"
+        count = clan.members
     except Exception:
         name, count = f"#{clan_tag}", None
 
@@ -228,7 +233,7 @@ class RecruitCog(commands.Cog):
         await interaction.response.defer()
         clan_tag = await resolve_clan_tag(interaction, tag)
         clan = await self.bot.cr.clan(clan_tag)
-        name = clan.get("name") or f"#{clan_tag}"
+        name = clan.name or f"#{clan_tag}"
         guild_id = interaction.guild.id
 
         existing = await self.bot.repo.clan_managers(guild_id, clan_tag)
@@ -275,7 +280,7 @@ class RecruitCog(commands.Cog):
         await interaction.response.defer()
         clan_tag = await resolve_clan_tag(interaction, tag)
         clan = await self.bot.cr.clan(clan_tag)
-        name = clan.get("name") or f"#{clan_tag}"
+        name = clan.name or f"#{clan_tag}"
 
         await self.bot.repo.set_clan_mode(clan_tag, interaction.guild.id, mode)
         if mode == "rotation":
@@ -308,16 +313,10 @@ class RecruitCog(commands.Cog):
             ))
             return
 
-        async def _name(clan_tag: str) -> str | None:
-            try:
-                return (await self.bot.cr.clan(clan_tag)).get("name")
-            except Exception:
-                return None
-
-        names = await asyncio.gather(*(_name(tag) for tag in tags))
+        clans = await self.bot.cr.map_concurrent(self.bot.cr.clan, tags)
         rows = [
-            (tag, name, await self.bot.repo.clan_managers(guild_id, tag))
-            for tag, name in zip(tags, names, strict=True)
+            (tag, clan.value.name if clan.ok else None, await self.bot.repo.clan_managers(guild_id, tag))
+            for tag, clan in zip(tags, clans, strict=True)
         ]
         rows.sort(key=lambda r: (r[1] or r[0]).lower())
 
@@ -349,7 +348,7 @@ class RecruitCog(commands.Cog):
         await interaction.response.defer()
         clan_tag = await resolve_clan_tag(interaction, tag)
         clan = await self.bot.cr.clan(clan_tag)
-        name = clan.get("name") or f"#{clan_tag}"
+        name = clan.name or f"#{clan_tag}"
 
         await self.bot.repo.set_clan_needs(clan_tag, interaction.guild.id, number, manual=True)
         if number == 0:
@@ -374,17 +373,13 @@ class RecruitCog(commands.Cog):
             ))
             return
 
-        async def _clan(clan_tag: str) -> dict | None:
-            try:
-                return await self.bot.cr.clan(clan_tag)
-            except Exception:
-                return None
-
         guild_id = interaction.guild.id
-        clans = await asyncio.gather(*(_clan(tag) for tag, _ in needs))
+        with accept_stale() as freshness:
+            results = await self.bot.cr.map_concurrent(self.bot.cr.clan, [tag for tag, _ in needs])
+        clans = [result.value if result.ok else Clan() for result in results]
         modes = await asyncio.gather(*(self.bot.repo.clan_mode(tag, guild_id) for tag, _ in needs))
         rows = [
-            (clan_tag, needed, (clan or {}).get("name"), (clan or {}).get("members"), mode)
+            (clan_tag, needed, clan.name or None, clan.members, mode)
             for (clan_tag, needed), clan, mode in zip(needs, clans, modes, strict=True)
         ]
         # Most-needy clans first, then alphabetically by name (falling back to tag).
@@ -401,17 +396,31 @@ class RecruitCog(commands.Cog):
 
         for index, page in enumerate(_paginate(lines)):
             title = "Clan Recruitment Needs" if index == 0 else "Clan Recruitment Needs (continued)"
-            await interaction.followup.send(embed=make_embed(title, page))
+            await interaction.followup.send(embed=add_as_of_note(make_embed(title, page), freshness.as_of))
 
     # ---- background poll: keep numbers fresh, prompt on member drops ----
 
     @tasks.loop(seconds=POLL_INTERVAL_SECONDS)
     async def poll_clans(self):
-        for guild_id, clan_tag in await self.bot.repo.all_managed_clans():
-            try:
-                await self._process_clan(guild_id, clan_tag)
-            except Exception:
-                logger.exception("Failed to process recruiting for clan %s in guild %s", clan_tag, guild_id)
+        if self.bot.cr.is_down:
+            logger.info("Skipping recruit poll: Clash Royale API is down (retry in %.0fs)",
+                        self.bot.cr.breaker_status().retry_in)
+            return
+
+        async def process(row: tuple[int, str]) -> None:
+            with deadline(BACKGROUND_BUDGET):
+                await self._process_clan(*row)
+
+        # Nobody is waiting on this refresh; let slash commands jump the API queue.
+        with request_priority(Priority.BACKGROUND):
+            results = await self.bot.cr.map_concurrent(process, await self.bot.repo.all_managed_clans())
+        for result in results:
+            if not result.ok:
+                guild_id, clan_tag = result.item
+                logger.error("Failed to process recruiting for clan %s in guild %s", clan_tag, guild_id,
+                             exc_info=result.error)
+        if self.poll_clans.current_loop % (STATS_LOG_INTERVAL_SECONDS // POLL_INTERVAL_SECONDS) == 0:
+            self.bot.cr.log_stats()
 
     @poll_clans.before_loop
     async def _wait_until_ready(self):
@@ -425,10 +434,10 @@ class RecruitCog(commands.Cog):
             clan = await self.bot.cr.clan(clan_tag)
         except Exception:
             return
-        count = clan.get("members")
+        count = clan.members
         if count is None:
             return
-        clan_name = clan.get("name") or f"#{clan_tag}"
+        clan_name = clan.name or f"#{clan_tag}"
         open_slots = max(0, CLAN_MAX_MEMBERS - count)
 
         state = await self.bot.repo.clan_need(clan_tag, guild_id)
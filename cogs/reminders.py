@@ -24,15 +24,16 @@ from cogs.checks import is_privileged
 from cogs.misc import chunk_message
 from cogs.resolvers import resolve_clan_tag
 from db.repository import Reminder
-from services.clash_royale import ClanMember, race_participants
+from services.clash_royale import WAR_DAY_RESET_UTC_HOUR, ClanMember, members_of, race_participants
+from services.deadline import SCHEDULED_BUDGET, deadline
+from services.ratelimit import Priority, request_priority
+from services.schemas import RaceParticipant
 from ui.embeds import make_embed
 
 logger = logging.getLogger(__name__)
 
 WAR_DAYS = {3, 4, 5, 6}  # datetime.weekday(): war days start Thursday through Sunday
 
-WAR_DAY_RESET_UTC_HOUR = 10  # each war day runs 10:00 UTC to 10:00 UTC
-
 MAX_DECKS_PER_DAY = 200  # 50 slots x 4 decks each
 MAX_SLOTS_PER_DAY = 50   # distinct players who may battle on one war day
 
@@ -79,13 +80,13 @@ def local_label(utc_time: str, zone: str) -> str:
     return now.astimezone(ZoneInfo(zone)).strftime("%H:%M")
 
 
-def war_day_totals(participants: dict[str, dict]) -> tuple[int, int]:
+def war_day_totals(participants: dict[str, RaceParticipant]) -> tuple[int, int]:
     """(decks remaining, slots remaining) for today across the whole clan.
 
     Each war day at most 50 participants may battle (anyone who used at
     least one deck consumes a slot) and each of them gets 4 decks.
     """
-    used = [int(p.get("decksUsedToday", 0)) for p in participants.values()]
+    used = [p.decks_used_today for p in participants.values()]
     decks_remaining = max(0, MAX_DECKS_PER_DAY - sum(used))
     slots_remaining = max(0, MAX_SLOTS_PER_DAY - sum(1 for decks in used if decks > 0))
     return decks_remaining, slots_remaining
@@ -338,7 +339,7 @@ class RemindersCog(commands.Cog):
         tag = await resolve_clan_tag(interaction, clan_tag)
         clan = await self.bot.cr.clan(tag)
         existing = await self.bot.repo.reminder(tag, interaction.guild.id)
-        view = ReminderFlowView(self, interaction.guild.id, tag, clan["name"], existing)
+        view = ReminderFlowView(self, interaction.guild.id, tag, clan.name, existing)
         await interaction.followup.send(embed=view.start(), view=view, ephemeral=True)
 
     # ---- scheduled delivery ----
@@ -346,12 +347,17 @@ class RemindersCog(commands.Cog):
     @tasks.loop(seconds=60)
     async def deliver_due_reminders(self):
         now_utc = datetime.now(UTC)
-        for reminder in await self.bot.repo.all_reminders():
-            try:
+
+        async def deliver(reminder: Reminder) -> None:
+            with deadline(SCHEDULED_BUDGET):
                 await self._deliver_if_due(reminder, now_utc)
-            except Exception:
-                logger.exception("Failed to deliver reminder for clan %s in guild %s",
-                                 reminder.clan_tag, reminder.guild_id)
+
+        with request_priority(Priority.SCHEDULED):
+            results = await self.bot.cr.map_concurrent(deliver, await self.bot.repo.all_reminders())
+        for result in results:
+            if not result.ok:
+                logger.error("Failed to deliver reminder for clan %s in guild %s",
+                             result.item.clan_tag, result.item.guild_id, exc_info=result.error)
 
     @deliver_due_reminders.before_loop
     async def _wait_until_ready(self):
@@ -403,17 +409,17 @@ class RemindersCog(commands.Cog):
         """Full reminder text, or None when there is nothing to remind about
         (no race, still a training day, or everyone finished their attacks)."""
         race = await self.bot.cr.current_river_race(clan_tag)
-        if race is None or race.get("periodType") == "training":
-            return None
+        if race is None or race.period_type == "training":
+            return None  # most ticks end here, without asking for the clan
 
         clan = await self.bot.cr.clan(clan_tag)
-        members = await self.bot.cr.clan_members(clan_tag)
         participants = race_participants(race)
         decks_remaining, slots_remaining = war_day_totals(participants)
 
         by_attacks_left: dict[int, list[str]] = {}
-        for member in members:
-            used = int(participants.get(member.tag, {}).get("decksUsedToday", 0))
+        for member in members_of(clan):
+            participant = participants.get(member.tag)
+            used = participant.decks_used_today if participant else 0
             attacks_left = 4 - used
             if attacks_left <= 0:
                 continue
@@ -421,7 +427,7 @@ class RemindersCog(commands.Cog):
         if not by_attacks_left:
             return None
 
-        return format_reminder(clan["name"], decks_remaining, slots_remaining, by_attacks_left)
+        return format_reminder(clan.name or f"#{clan_tag}", decks_remaining, slots_remaining, by_attacks_left)
 
     async def _format_member(self, member: ClanMember) -> str:
         """Linked members get pinged; the account name is appended when the
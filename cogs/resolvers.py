@@ -2,36 +2,48 @@
 
 from discord import Interaction
 
-from errors import InvalidClanTag, NotLinked
-from services.clash_royale import normalize_tag
+from errors import InvalidClanTag, InvalidPlayerTag, NotLinked
+from services.tags import Tag, is_valid_tag, normalize_tag
 
 
-async def resolve_clan_tag(interaction: Interaction, value: str) -> str:
+async def resolve_clan_tag(interaction: Interaction, value: str) -> Tag:
     """Resolve user input into a validated, normalized clan tag.
 
     Inputs shorter than 5 characters are treated as server nicknames
     (real tags are always longer); anything else as a raw tag.
-    Raises InvalidClanTag if the nickname is unknown or the clan doesn't exist.
+    Raises InvalidClanTag if the nickname is unknown, the tag is impossible or
+    the clan doesn't exist.
+    Both lookups are remembered for a while in ``bot.tag_memo``.
     """
     bot = interaction.client
     value = value.strip()
 
     if len(value) < 5:
-        clan_tag = await bot.repo.clan_tag_for_nickname(value, interaction.guild.id)
+        guild_id = interaction.guild.id
+        try:
+            clan_tag = bot.tag_memo.nickname(guild_id, value)
+        except KeyError:
+            clan_tag = await bot.repo.clan_tag_for_nickname(value, guild_id)
+            bot.tag_memo.remember_nickname(guild_id, value, clan_tag)
         if clan_tag is None:
             raise InvalidClanTag()
     else:
         clan_tag = normalize_tag(value)
+        if not is_valid_tag(clan_tag):
+            raise InvalidClanTag()
 
-    if not await bot.cr.clan_exists(clan_tag):
-        raise InvalidClanTag()
+    if not bot.tag_memo.is_known_clan(clan_tag):
+        if not await bot.cr.clan_exists(clan_tag):
+            raise InvalidClanTag()
+        bot.tag_memo.remember_clan(clan_tag)
     return clan_tag
 
 
-async def resolve_player_tag(interaction: Interaction, value: str) -> str:
+async def resolve_player_tag(interaction: Interaction, value: str) -> Tag:
     """Resolve a raw player tag or a Discord @mention into a normalized player tag.
 
     Mentions resolve to the user's main linked tag; raises NotLinked otherwise.
+    Raises InvalidPlayerTag for tags that can't exist, without asking the API.
     """
     value = value.strip()
     if value.startswith("<@") and value.endswith(">"):
@@ -42,4 +54,7 @@ async def resolve_player_tag(interaction: Interaction, value: str) -> str:
         if not tags:
             raise NotLinked("That user doesn't have a linked Clash Royale account.")
         return tags[0]
-    return normalize_tag(value)
+    tag = normalize_tag(value)
+    if not is_valid_tag(tag):
+        raise InvalidPlayerTag()
+    return tag
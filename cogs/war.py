@@ -11,7 +11,6 @@ from discord.ui import Select, View
 
 from cogs.resolvers import resolve_clan_tag, resolve_player_tag
 from errors import BotError
-from services.clash_royale import former_member_tags, race_participants
 from ui.embeds import excel_like_sort_key, make_embed
 from ui.emojis import FAME_EMOJI, FORMER_MEMBER_EMOJI, MULTIDECK_EMOJI, NEW_MEMBER_EMOJI
 from ui.views import DownloadCSVButton
@@ -20,7 +19,7 @@ matplotlib.use("Agg")
 import matplotlib.pyplot as plt  # noqa: E402
 
 
-@dataclass
+@dataclass(slots=True)
 class WarRow:
     tag: str
     name: str
@@ -183,25 +182,21 @@ class WarCog(commands.Cog):
         self.bot = bot
 
     async def fetch_war_rows(self, mode: str, clan_tag: str, n: int) -> tuple[str, list[WarRow]]:
-        clan = await self.bot.cr.clan(clan_tag)
-        members = await self.bot.cr.clan_members(clan_tag)
-        race = await self.bot.cr.current_river_race(clan_tag)
-        history = await self.bot.cr.river_race_log(clan_tag)
+        snapshot = await self.bot.cr.clan_snapshot(clan_tag)
+        history = snapshot.history
+        participants = snapshot.participants if mode == "current" else history.participants(n)
 
-        participants = race_participants(race) if mode == "current" else history.participants(n)
-        former = former_member_tags(race, members)
-
-        people = [(m.tag, m.name, False) for m in members]
-        people += [(tag, name, True) for tag, name in former.items()]
+        people = [(m.tag, m.name, False) for m in snapshot.members]
+        people += [(tag, name, True) for tag, name in snapshot.former.items()]
 
         rows = []
         for tag, name, is_former in people:
-            participant = participants.get(tag, {})
+            participant = participants.get(tag)
             row = WarRow(
                 tag=tag,
                 name=name,
-                fame=int(participant.get("fame", 0)),
-                decks=int(participant.get("decksUsed", 0)),
+                fame=participant.fame if participant else 0,
+                decks=participant.decks_used if participant else 0,
                 is_new=history.is_new_member(tag),
                 is_former=is_former,
             )
@@ -209,7 +204,7 @@ class WarCog(commands.Cog):
             if mode in ("current", "last") and is_former and row.decks == 0:
                 continue
             rows.append(row)
-        return clan["name"], rows
+        return snapshot.name, rows
 
     async def _send_war_table(self, interaction: Interaction, mode: str, clan: str, n: int):
         await interaction.response.defer()
@@ -261,11 +256,10 @@ async def send_fame_stats(interaction: Interaction, player_tag: str, from_war: i
     bot = interaction.client
     player = await bot.cr.player(player_tag)
 
-    clan_info = player.get("clan")
-    if not clan_info:
+    if player.clan is None:
         raise BotError("This player is not currently in a clan.")
 
-    history = await bot.cr.river_race_log(clan_info["tag"])
+    history = await bot.cr.river_race_log(player.clan.tag)
     war_numbers = list(range(from_war, to_war - 1, -1))
     fame_values = [history.fame(player_tag, n) for n in war_numbers]
 
@@ -290,7 +284,7 @@ async def send_fame_stats(interaction: Interaction, player_tag: str, from_war: i
 
     plt.axhline(y=average_fame, color="#9B59B6", linestyle="--",
                 label=f"Average ({average_fame:.1f})", linewidth=2)
-    plt.title(f"Fame History for {player.get('name')}", color="white", pad=20)
+    plt.title(f"Fame History for {player.name}", color="white", pad=20)
     plt.xlabel("Wars Ago", color="white")
     plt.ylabel("Fame", color="white")
     plt.grid(True, alpha=0.2, color="gray")
@@ -305,7 +299,7 @@ async def send_fame_stats(interaction: Interaction, player_tag: str, from_war: i
     buf.seek(0)
     plt.close(fig)
 
-    embed = make_embed("Fame Analysis", f"Player: {player.get('name')} (#{player_tag})")
+    embed = make_embed("Fame Analysis", f"Player: {player.name} (#{player_tag})")
     embed.add_field(
         name="War Range",
         value=f"From {from_war} to {to_war} wars ago \n {len(fame_values)} wars analyzed",
@@ -3,31 +3,68 @@ from dataclasses import dataclass
 
 from dotenv import load_dotenv
 
+from db.response_cache import cache_path_for
+
 
 class ConfigError(Exception):
     pass
 
 
+def _positive_float(name: str, default: float) -> float:
+    raw = os.getenv(name)
+    if not raw:
+        return default
+    try:
+        value = float(raw)
+    except ValueError:
+        raise ConfigError(f"{name} must be a number, got {raw!r}") from None
+    if value <= 0:
+        raise ConfigError(f"{name} must be positive, got {raw!r}")
+    return value
+
+
 @dataclass(frozen=True)
 class Config:
     discord_token: str
-    clash_royale_api_key: str
+    clash_royale_api_keys: tuple[str, ...]  # requests are spread across every key
     deckai_api_key: str | None
     database_path: str
     guide_url: str | None  # public URL of the hosted command guide, shown by /info
+    clash_royale_rate_limit: float  # requests per second per key, shared by every command and loop
+    deckai_rate_limit: float
+    memory_cache_max_bytes: int  # estimated RAM for decoded API responses
+    response_cache_path: str  # on-disk API response cache, kept across restarts
+    response_cache_max_bytes: int
+    tag_memo_ttl: float  # seconds resolved clan nicknames and validated tags are remembered
 
     @classmethod
     def from_env(cls) -> "Config":
         load_dotenv()
 
-        missing = [name for name in ("DISCORD_TOKEN", "CLASH_ROYALE_API_KEY") if not os.getenv(name)]
+        # CLASH_ROYALE_API_KEYS (comma-separated) registers a pool; CLASH_ROYALE_API_KEY a single key.
+        api_keys = tuple(
+            key.strip()
+            for key in (os.getenv("CLASH_ROYALE_API_KEYS") or os.getenv("CLASH_ROYALE_API_KEY") or "").split(",")
+            if key.strip()
+        )
+
+        missing = [name for name in ("DISCORD_TOKEN",) if not os.getenv(name)]
+        if not api_keys:
+            missing.append("CLASH_ROYALE_API_KEY (or CLASH_ROYALE_API_KEYS)")
         if missing:
             raise ConfigError(f"Missing required environment variables: {', '.join(missing)}")
 
+        database_path = os.getenv("DATABASE_PATH", "database.db")
         return cls(
             discord_token=os.environ["DISCORD_TOKEN"],
-            clash_royale_api_key=os.environ["CLASH_ROYALE_API_KEY"],
+            clash_royale_api_keys=api_keys,
             deckai_api_key=os.getenv("DECKAI_API_KEY") or None,
-            database_path=os.getenv("DATABASE_PATH", "database.db"),
+            database_path=database_path,
             guide_url=os.getenv("GUIDE_URL") or None,
+            clash_royale_rate_limit=_positive_float("CLASH_ROYALE_RATE_LIMIT", 10.0),
+            deckai_rate_limit=_positive_float("DECKAI_RATE_LIMIT", 2.0),
+            memory_cache_max_bytes=int(_positive_float("MEMORY_CACHE_MAX_MB", 32) * 1024 * 1024),
+            response_cache_path=os.getenv("RESPONSE_CACHE_PATH") or cache_path_for(database_path),
+            response_cache_max_bytes=int(_positive_float("RESPONSE_CACHE_MAX_MB", 64) * 1024 * 1024),
+            tag_memo_ttl=_positive_float("TAG_MEMO_TTL", 600),
         )
@@ -1,11 +1,12 @@
-"""All database queries live here. Tags are stored normalized (no '#', uppercase)."""
+"""All database queries live here. Tags are stored normalized (no '#', uppercase)
+and come back out as canonical ``Tag`` values."""
 
 from dataclasses import dataclass
 from datetime import UTC, datetime
 
 import aiosqlite
 
-from services.clash_royale import normalize_tag
+from services.tags import Tag, intern_tag, normalize_tag
 
 MAX_LINKED_TAGS = 20
 
@@ -16,19 +17,19 @@ def _now_iso() -> str:
     return datetime.now(UTC).isoformat()
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Reminder:
-    clan_tag: str  # normalized
+    clan_tag: Tag
     guild_id: int
     channel_id: int
     timezone: str  # IANA name, e.g. "America/New_York"; used only to display times locally
     times: tuple[str, ...]  # "HH:MM" in UTC
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ClanNeed:
     """A clan's recruiting state in one guild."""
-    clan_tag: str  # normalized
+    clan_tag: Tag
     guild_id: int
     needed: int
     manual: bool  # True = a leader pinned the number; False = auto-tracked open slots
@@ -43,12 +44,12 @@ class Repository:
 
     # ---- player links ----
 
-    async def player_tags(self, discord_id: int) -> list[str]:
+    async def player_tags(self, discord_id: int) -> list[Tag]:
         cursor = await self._conn.execute(
             "SELECT player_tag FROM player_links WHERE discord_id = ? ORDER BY position",
             (int(discord_id),),
         )
-        return [row[0] for row in await cursor.fetchall()]
+        return [intern_tag(row[0]) for row in await cursor.fetchall()]
 
     async def set_player_tags(self, discord_id: int, tags: list[str]) -> None:
         await self._conn.execute("DELETE FROM player_links WHERE discord_id = ?", (int(discord_id),))
@@ -115,13 +116,13 @@ class Repository:
 
     # ---- clan nicknames ----
 
-    async def clan_tag_for_nickname(self, nickname: str, guild_id: int) -> str | None:
+    async def clan_tag_for_nickname(self, nickname: str, guild_id: int) -> Tag | None:
         cursor = await self._conn.execute(
             "SELECT clan_tag FROM clan_links WHERE nickname = ? COLLATE NOCASE AND guild_id = ?",
             (nickname.strip(), int(guild_id)),
         )
         row = await cursor.fetchone()
-        return row[0] if row else None
+        return intern_tag(row[0]) if row else None
 
     async def nickname_for_clan(self, clan_tag: str, guild_id: int) -> str | None:
         cursor = await self._conn.execute(
@@ -146,13 +147,13 @@ class Repository:
         await self._conn.commit()
         return cursor.rowcount > 0
 
-    async def clan_links_for_guild(self, guild_id: int) -> list[tuple[str, str]]:
+    async def clan_links_for_guild(self, guild_id: int) -> list[tuple[Tag, str]]:
         """[(clan_tag, nickname), ...] for a guild."""
         cursor = await self._conn.execute(
             "SELECT clan_tag, nickname FROM clan_links WHERE guild_id = ?",
             (int(guild_id),),
         )
-        return [(row[0], row[1]) for row in await cursor.fetchall()]
+        return [(intern_tag(row[0]), row[1]) for row in await cursor.fetchall()]
 
     # ---- clan recruitment needs ----
 
@@ -210,14 +211,14 @@ class Repository:
         )
         await self._conn.commit()
 
-    async def clan_by_thread(self, thread_id: int) -> tuple[int, str] | None:
+    async def clan_by_thread(self, thread_id: int) -> tuple[int, Tag] | None:
         """(guild_id, clan_tag) owning a recruiting thread, or None."""
         cursor = await self._conn.execute(
             "SELECT guild_id, clan_tag FROM clan_needs WHERE thread_id = ?",
             (int(thread_id),),
         )
         row = await cursor.fetchone()
-        return (row[0], row[1]) if row else None
+        return (row[0], intern_tag(row[1])) if row else None
 
     async def clan_mode(self, clan_tag: str, guild_id: int) -> str:
         """'standard' (auto-track open slots) or 'rotation' (manager-driven roster).
@@ -247,13 +248,13 @@ class Repository:
         await self._conn.commit()
         return cursor.rowcount > 0
 
-    async def clan_needs_for_guild(self, guild_id: int) -> list[tuple[str, int]]:
+    async def clan_needs_for_guild(self, guild_id: int) -> list[tuple[Tag, int]]:
         """[(clan_tag, needed), ...] for clans in a guild that need recruits."""
         cursor = await self._conn.execute(
             "SELECT clan_tag, needed FROM clan_needs WHERE guild_id = ? AND needed > 0",
             (int(guild_id),),
         )
-        return [(row[0], row[1]) for row in await cursor.fetchall()]
+        return [(intern_tag(row[0]), row[1]) for row in await cursor.fetchall()]
 
     # ---- clan managers (who to prompt about recruiting) ----
 
@@ -279,20 +280,20 @@ class Repository:
         )
         return [row[0] for row in await cursor.fetchall()]
 
-    async def managed_clans(self, guild_id: int) -> list[str]:
+    async def managed_clans(self, guild_id: int) -> list[Tag]:
         """Distinct clan tags in a guild that have at least one manager."""
         cursor = await self._conn.execute(
             "SELECT DISTINCT clan_tag FROM clan_managers WHERE guild_id = ?",
             (int(guild_id),),
         )
-        return [row[0] for row in await cursor.fetchall()]
+        return [intern_tag(row[0]) for row in await cursor.fetchall()]
 
-    async def all_managed_clans(self) -> list[tuple[int, str]]:
+    async def all_managed_clans(self) -> list[tuple[int, Tag]]:
         """(guild_id, clan_tag) for every clan that has at least one manager."""
         cursor = await self._conn.execute(
             "SELECT DISTINCT guild_id, clan_tag FROM clan_managers"
         )
-        return [(row[0], row[1]) for row in await cursor.fetchall()]
+        return [(row[0], intern_tag(row[1])) for row in await cursor.fetchall()]
 
     # ---- recruiting channel (parent for per-clan threads) ----
 
@@ -328,7 +329,8 @@ class Repository:
         cursor = await self._conn.execute("SELECT clan_tag, guild_id, channel_id, timezone FROM reminders")
         rows = await cursor.fetchall()
         return [
-            Reminder(clan_tag, guild_id, channel_id, timezone, await self._reminder_times(clan_tag, guild_id))
+            Reminder(intern_tag(clan_tag), guild_id, channel_id, timezone,
+                     await self._reminder_times(clan_tag, guild_id))
             for clan_tag, guild_id, channel_id, timezone in rows
         ]
 
@@ -0,0 +1,117 @@
+"""On-disk second tier behind the API clients' in-memory caches.
+
+Response bodies are kept in their own SQLite file (next to the main database,
+so the control panel's DB viewer isn't cluttered by them) with their fetch
+time and expiry, so a restart can pick up where the last process left off
+instead of re-downloading every clan and race log. Entries are loaded lazily
+on a memory miss; the file is kept under ``max_bytes`` by dropping the
+least recently fetched bodies.
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import aiosqlite
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key        TEXT PRIMARY KEY,   -- base URL + path + sorted query string
+    body       BLOB NOT NULL,      -- raw JSON as received
+    fetched_at REAL NOT NULL,      -- unix time
+    expires_at REAL NOT NULL,      -- unix time the response stops being fresh
+    size       INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_fetched ON responses (fetched_at);
+"""
+
+EVICT_TO = 0.9  # after going over budget, trim down to this fraction of it
+
+
+def cache_path_for(database_path: str) -> str:
+    """Default location: ``response_cache.db`` in the same directory as the main database."""
+    return str(Path(database_path).resolve().parent / "response_cache.db")
+
+
+@dataclass(frozen=True)
+class StoredResponse:
+    body: bytes
+    fetched_at: float  # unix time
+    expires_at: float  # unix time
+
+
+class ResponseCache:
+    def __init__(self, path: str, max_bytes: int, keep_expired_for: float = 0):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.keep_expired_for = keep_expired_for  # expired bodies still useful as stale data
+        self.conn: aiosqlite.Connection | None = None
+        self._total_bytes = 0
+
+    async def connect(self) -> None:
+        self.conn = await aiosqlite.connect(self.path)
+        await self.conn.execute("PRAGMA journal_mode=WAL")
+        await self.conn.executescript(SCHEMA)
+        await self.conn.execute(
+            "DELETE FROM responses WHERE expires_at < ?", (time.time() - self.keep_expired_for,)
+        )
+        await self.conn.commit()
+        cursor = await self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses")
+        (self._total_bytes,) = await cursor.fetchone()
+        logger.info("Response cache ready at %s (%d bytes)", self.path, self._total_bytes)
+
+    async def close(self) -> None:
+        if self.conn is not None:
+            await self.conn.close()
+            self.conn = None
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    async def get(self, key: str) -> StoredResponse | None:
+        """The stored response, or None if absent or past its expiry plus ``keep_expired_for``."""
+        cursor = await self.conn.execute(
+            "SELECT body, fetched_at, expires_at FROM responses WHERE key = ?", (key,)
+        )
+        row = await cursor.fetchone()
+        if row is None or row[2] + self.keep_expired_for < time.time():
+            return None
+        return StoredResponse(bytes(row[0]), row[1], row[2])
+
+    async def put(self, key: str, body: bytes, fetched_at: float, expires_at: float) -> None:
+        cursor = await self.conn.execute("SELECT size FROM responses WHERE key = ?", (key,))
+        previous = await cursor.fetchone()
+        await self.conn.execute(
+            "INSERT OR REPLACE INTO responses (key, body, fetched_at, expires_at, size) VALUES (?, ?, ?, ?, ?)",
+            (key, body, fetched_at, expires_at, len(body)),
+        )
+        self._total_bytes += len(body) - (previous[0] if previous else 0)
+        if self._total_bytes > self.max_bytes:
+            await self._evict()
+        await self.conn.commit()
+
+    async def delete(self, key: str) -> None:
+        cursor = await self.conn.execute("SELECT size FROM responses WHERE key = ?", (key,))
+        row = await cursor.fetchone()
+        if row is None:
+            return
+        await self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+        await self.conn.commit()
+        self._total_bytes -= row[0]
+
+    async def _evict(self) -> None:
+        """Drop the oldest fetched bodies until the file is back under ``EVICT_TO`` of the budget."""
+        target = self.max_bytes * EVICT_TO
+        cursor = await self.conn.execute("SELECT key, size FROM responses ORDER BY fetched_at")
+        doomed = []
+        async for key, size in cursor:
+            if self._total_bytes <= target:
+                break
+            doomed.append((key,))
+            self._total_bytes -= size
+        await self.conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+        logger.info("Evicted %d cached responses (%d bytes left)", len(doomed), self._total_bytes)
@@ -19,6 +19,10 @@ class InvalidClanTag(BotError):
     user_message = "That clan tag or nickname doesn't look right. Double-check it and try again."
 
 
+class InvalidPlayerTag(BotError):
+    user_message = "That player tag doesn't look right. Double-check it and try again."
+
+
 class ClanNotFound(BotError):
     user_message = "No clan found with that tag. Double-check it and try again."
 
@@ -45,3 +49,13 @@ class RateLimited(BotError):
 
 class APIUnavailable(BotError):
     user_message = "The Clash Royale API isn't responding right now. Please try again later."
+
+
+class APIDown(APIUnavailable):
+    # Raised by every API client (DeckAI too), so the message names no service.
+    user_message = "The service I get this data from is down right now. Please try again in a few minutes."
+
+
+class DeadlineExceeded(APIUnavailable):
+    # Raised by every API client (DeckAI too), so the message names no service.
+    user_message = "The service I get this data from is taking too long to answer. Please try again in a moment."
@@ -0,0 +1,85 @@
+"""Circuit breaker for one upstream API.
+
+When an upstream is down, every request would otherwise sit out the
+session's full timeout before failing, holding up commands and background
+loops alike. After ``failure_threshold`` consecutive failures (timeouts,
+connection errors, 5xx) the breaker opens and requests fail at once. After
+``cooldown`` seconds one probe request is let through: success closes the
+breaker, failure opens it for another cooldown.
+
+Answers like 404, 403 and 429 count as successes: the upstream is up, it
+just said no.
+"""
+
+import time
+from dataclasses import dataclass
+from enum import Enum
+
+
+class BreakerState(Enum):
+    CLOSED = "closed"  # requests flow normally
+    OPEN = "open"  # failing fast until the cooldown ends
+    HALF_OPEN = "half-open"  # cooldown over; one probe decides
+
+
+@dataclass(frozen=True)
+class BreakerStatus:
+    state: BreakerState
+    consecutive_failures: int
+    retry_in: float  # seconds until a probe is allowed (0 unless open)
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = 5, cooldown: float = 30.0):
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be at least 1")
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._failures = 0
+        self._opened_at: float | None = None  # time.monotonic() the breaker last opened
+        self._probing = False
+
+    @property
+    def state(self) -> BreakerState:
+        if self._opened_at is None:
+            return BreakerState.CLOSED
+        if time.monotonic() - self._opened_at < self.cooldown:
+            return BreakerState.OPEN
+        return BreakerState.HALF_OPEN
+
+    @property
+    def is_open(self) -> bool:
+        """Whether requests are being refused right now (open, or half-open with the probe out)."""
+        state = self.state
+        return state is BreakerState.OPEN or (state is BreakerState.HALF_OPEN and self._probing)
+
+    @property
+    def retry_in(self) -> float:
+        if self._opened_at is None:
+            return 0.0
+        return max(0.0, self._opened_at + self.cooldown - time.monotonic())
+
+    def claim_probe(self) -> bool:
+        """Called for a request ``is_open`` let through: True if it is the half-open probe."""
+        if self.state is not BreakerState.HALF_OPEN:
+            return False
+        self._probing = True
+        return True
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._probing or (self._opened_at is None and self._failures >= self.failure_threshold):
+            self._opened_at = time.monotonic()
+        self._probing = False
+
+    def abandon_probe(self) -> None:
+        """The probe ended without an answer (e.g. cancelled); let the next request probe instead."""
+        self._probing = False
+
+    def status(self) -> BreakerStatus:
+        return BreakerStatus(self.state, self._failures, self.retry_in)
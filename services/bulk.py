@@ -0,0 +1,60 @@
+"""Bounded-concurrency fan-out for commands and loops that touch many tags.
+
+A plain ``asyncio.gather`` over 20 player tags queues all 20 on the rate
+limiter at once, ahead of any other command's requests; a sequential loop
+pays every round trip in turn. These helpers run at most ``limit`` calls at a
+time and hand back one ``BulkResult`` per item, so one bad tag doesn't fail
+the whole batch.
+"""
+
+import asyncio
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass(frozen=True)
+class BulkResult:
+    item: Any  # the input this result is for
+    value: Any = None
+    error: Exception | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _start(func: Callable[[Any], Awaitable[Any]], items: Iterable[Any], limit: int) -> list[asyncio.Task]:
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(item: Any) -> BulkResult:
+        async with semaphore:
+            try:
+                return BulkResult(item, value=await func(item))
+            except Exception as exc:
+                return BulkResult(item, error=exc)
+
+    # Tasks copy the caller's context, so request priority and deadline carry over.
+    return [asyncio.ensure_future(run(item)) for item in items]
+
+
+async def map_concurrent(func: Callable[[Any], Awaitable[Any]], items: Iterable[Any], limit: int) -> list[BulkResult]:
+    """``func(item)`` for every item, at most ``limit`` at a time; results in input order."""
+    tasks = _start(func, items, limit)
+    try:
+        return list(await asyncio.gather(*tasks))
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def as_completed(func: Callable[[Any], Awaitable[Any]], items: Iterable[Any],
+                       limit: int) -> AsyncIterator[BulkResult]:
+    """Like ``map_concurrent``, yielding each result as soon as it is ready."""
+    tasks = _start(func, items, limit)
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
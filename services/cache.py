@@ -0,0 +1,160 @@
+"""In-memory API response cache bounded by estimated bytes, not entry count.
+
+A race log decoded for one clan costs as much memory as hundreds of small
+clan lookups, so an entry-count cap says little about how much RAM the
+cache will take on a small VPS. Each entry carries a size estimate instead;
+once the total passes ``max_bytes``, expired entries go first, then the
+largest of the least recently used few, so big cold responses make room
+before small hot ones.
+"""
+
+import itertools
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+EVICTION_SAMPLE = 8  # least recently used entries considered per eviction
+
+# Decoded size relative to the raw JSON body, measured with benchmarks/bench_decode.py.
+DICT_SIZE_FACTOR = 3.2
+STRUCT_SIZE_FACTOR = 1.5
+PROJECTION_SIZE = 2048  # a projection keeps a fixed handful of fields, whatever the body size
+
+_TAG_SEGMENT = re.compile(r"/%23[^/]+")
+
+
+def estimate_size(body: bytes, typed: bool) -> int:
+    """Approximate memory held by ``body`` once decoded (into structs if ``typed``)."""
+    return int(len(body) * (STRUCT_SIZE_FACTOR if typed else DICT_SIZE_FACTOR))
+
+
+def endpoint_family(path: str) -> str:
+    """Path with tags replaced, so stats group e.g. every clan's race log together."""
+    return _TAG_SEGMENT.sub("/{tag}", path)
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    data: Any
+    fetched_at: datetime  # wall clock, for "as of" notes
+    fresh_until: float  # time.monotonic() deadline; past it the entry is stale
+    size: int = 0  # estimated bytes held by ``data``
+
+
+@dataclass(frozen=True)
+class FamilyStats:
+    entries: int
+    bytes: int
+    hits: int
+    misses: int
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class _FamilyCounters:
+    __slots__ = ("entries", "bytes", "hits", "misses")
+
+    def __init__(self):
+        self.entries = 0
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+
+class MemoryCache:
+    """Keys are ``(path, params, schema)`` tuples. Entries are dropped ``grace`` seconds after going stale."""
+
+    def __init__(self, max_bytes: int, grace: float = 0):
+        self.max_bytes = max_bytes
+        self.grace = grace
+        self._entries: OrderedDict[tuple, CachedResponse] = OrderedDict()
+        self._bytes = 0
+        self._families: dict[str, _FamilyCounters] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def total_bytes(self) -> int:
+        return self._bytes
+
+    def _family(self, key: tuple) -> _FamilyCounters:
+        family = endpoint_family(key[0])
+        if family not in self._families:
+            self._families[family] = _FamilyCounters()
+        return self._families[family]
+
+    def _expired(self, entry: CachedResponse, now: float) -> bool:
+        return entry.fresh_until + self.grace <= now
+
+    def get(self, key: tuple) -> CachedResponse | None:
+        """The entry (fresh or still within the grace window), marking it recently used.
+
+        Doesn't count a hit or miss: whether a stale entry is usable is the
+        caller's decision, reported through ``record_lookup``.
+        """
+        entry = self._entries.get(key)
+        if entry is not None and self._expired(entry, time.monotonic()):
+            self._remove(key)
+            entry = None
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def record_lookup(self, key: tuple, hit: bool) -> None:
+        """Count a lookup that was (``hit``) or wasn't answered from the cache."""
+        counters = self._family(key)
+        if hit:
+            counters.hits += 1
+        else:
+            counters.misses += 1
+
+    def peek(self, key: tuple) -> CachedResponse | None:
+        """Like ``get`` but without touching recency."""
+        entry = self._entries.get(key)
+        if entry is None or self._expired(entry, time.monotonic()):
+            return None
+        return entry
+
+    def __setitem__(self, key: tuple, entry: CachedResponse) -> None:
+        if key in self._entries:
+            self._remove(key)
+        if entry.size > self.max_bytes:
+            return  # would evict everything else and still not fit
+        self._entries[key] = entry
+        self._bytes += entry.size
+        counters = self._family(key)
+        counters.entries += 1
+        counters.bytes += entry.size
+        self._evict()
+
+    def items(self):
+        return list(self._entries.items())
+
+    def _remove(self, key: tuple) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+        counters = self._family(key)
+        counters.entries -= 1
+        counters.bytes -= entry.size
+
+    def _evict(self) -> None:
+        now = time.monotonic()
+        while self._bytes > self.max_bytes:
+            oldest = list(itertools.islice(self._entries.items(), EVICTION_SAMPLE))
+            expired = [key for key, entry in oldest if self._expired(entry, now)]
+            victim = expired[0] if expired else max(oldest, key=lambda item: item[1].size)[0]
+            self._remove(victim)
+
+    def stats(self) -> dict[str, FamilyStats]:
+        """Entries, bytes and hit ratio per endpoint family since startup."""
+        return {
+            family: FamilyStats(c.entries, c.bytes, c.hits, c.misses)
+            for family, c in sorted(self._families.items())
+        }
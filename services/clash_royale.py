@@ -1,22 +1,47 @@
 """Clash Royale API client and in-memory war-log computations.
 
-The client fetches whole responses (clan, members, current river race, race
-log); everything per-member — fame, decks used, weeks in clan, new/former
-status — is computed here from those responses instead of re-hitting the API
-for each member.
+The client fetches whole responses (clan with its member list, current river
+race, race log); everything per-member — fame, decks used, weeks in clan,
+new/former status — is computed here from those responses instead of
+re-hitting the API for each member. Clans, river races, race logs and
+tournaments are decoded straight into the typed shapes in ``services.schemas``.
 
-Tags are handled in normalized form (no leading '#', uppercase) everywhere in
+Tags are handled as canonical ``Tag`` values (``services.tags``) everywhere in
 the bot; they are prefixed with '%23' only when building request URLs.
 """
 
+import asyncio
+import sys
+from collections.abc import Sequence
 from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
 
 import aiohttp
+import numpy as np
 
+from db.response_cache import ResponseCache
 from errors import ClanNotFound, PlayerNotFound, TournamentNotFound
-from services.http import BaseAPIClient, NotFoundError
+from services.cache import estimate_size
+from services.http import BaseAPIClient, NotFoundError, Projection
+from services.schemas import (
+    Clan,
+    Player,
+    PlayerSummary,
+    RaceLog,
+    RaceLogItem,
+    RaceParticipant,
+    RiverRace,
+    Tournament,
+)
+from services.tags import Tag, normalize_tag
 
 BASE_URL = "https://api.clashroyale.com/v1"
+DEFAULT_REQUESTS_PER_SECOND = 10.0
+
+WAR_DAY_RESET_UTC_HOUR = 10  # each war day runs 10:00 UTC to 10:00 UTC
+WAR_END_WEEKDAY = 0  # datetime.weekday(): the week's river race ends Monday at the reset
+RACE_LOG_SETTLE = timedelta(minutes=30)  # the finished war can take a while to appear in the log
+RACE_LOG_SETTLE_TTL = 300
 
 ROLE_DISPLAY = {
     "member": "Member",
@@ -27,19 +52,75 @@ ROLE_DISPLAY = {
 }
 
 
-def normalize_tag(tag: str) -> str:
-    """Canonical tag form: no '#', uppercase, common O/0 typo fixed."""
-    return tag.strip().lstrip("#").upper().replace("O", "0")
+def next_war_end(now: datetime) -> datetime:
+    """The next Monday 10:00 UTC strictly after ``now``."""
+    now = now.astimezone(UTC)
+    end = now.replace(hour=WAR_DAY_RESET_UTC_HOUR, minute=0, second=0, microsecond=0)
+    end += timedelta(days=(WAR_END_WEEKDAY - now.weekday()) % 7)
+    return end if end > now else end + timedelta(days=7)
+
 
+def race_log_ttl(now: datetime | None = None) -> float:
+    """Cache the race log until the next war ends; it can't change before then.
 
-@dataclass(frozen=True)
+    Right after a war ends the API may still be serving the old log, so
+    responses fetched in that window are only cached briefly.
+    """
+    now = now or datetime.now(UTC)
+    last_end = next_war_end(now) - timedelta(days=7)
+    if now - last_end < RACE_LOG_SETTLE:
+        return RACE_LOG_SETTLE_TTL
+    return (next_war_end(now) - now).total_seconds()
+
+
+STALE_GRACE = 600  # seconds an expired response may still be served to accept_stale() callers
+NOT_FOUND_TTL = 120  # seconds a 404 for a clan/player/tournament tag is remembered
+
+# Path patterns -> cache TTL; first match wins, anything else uses the client default.
+# Fixed TTLs only apply when the response has no caching headers; the race log
+# TTL comes from the war calendar and is kept unless the headers allow longer.
+CACHE_TTLS = (
+    (r"^/clans/[^/]+/riverracelog$", race_log_ttl),
+    (r"^/clans/[^/]+/currentriverrace$", 30),  # changes with every battle
+    (r"^/clans/[^/]+$", 180),  # name, badge, member count: slow-moving
+    (r"^/players/", 120),
+)
+
+
+def summarize_player(player: Player) -> PlayerSummary:
+    """The few fields the embeds show; the full card and badge lists are dropped."""
+    badges = {badge.name: badge.progress for badge in player.badges}
+    levels_below_max = [card.max_level - card.level for card in player.cards]
+    return PlayerSummary(
+        name=player.name,
+        exp_level=player.exp_level,
+        trophies=player.trophies,
+        best_trophies=player.best_trophies,
+        role=player.role,
+        clan=player.clan,
+        ranked_current=player.current_path_of_legend_season_result,
+        ranked_best=player.best_path_of_legend_season_result,
+        clan_war_wins=badges.get("ClanWarWins", 0),
+        classic_challenge_wins=badges.get("Classic12Wins", 0),
+        grand_challenge_wins=badges.get("Grand12Wins", 0),
+        evolutions=sum(1 for card in player.cards if card.evolution_level == 1),
+        max_level_cards=levels_below_max.count(0),
+        max_minus_1_cards=levels_below_max.count(1),
+        max_minus_2_cards=levels_below_max.count(2),
+    )
+
+
+PLAYER_SUMMARY = Projection(Player, summarize_player)
+
+
+@dataclass(frozen=True, slots=True)
 class ClanMember:
-    tag: str  # normalized
+    tag: Tag
     name: str
     role: str  # member | elder | coLeader | leader
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class TournamentPlayer:
     name: str
     score: int
@@ -47,24 +128,42 @@ class TournamentPlayer:
 
 
 class ClashRoyaleClient(BaseAPIClient):
-    def __init__(self, session: aiohttp.ClientSession, api_key: str, base_url: str = BASE_URL):
-        super().__init__(session, base_url, {"Authorization": f"Bearer {api_key}"})
+    """``api_keys`` is one key or a pool of them; ``requests_per_second`` is per key."""
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        api_keys: str | Sequence[str],
+        base_url: str = BASE_URL,
+        requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND,
+        disk_cache: ResponseCache | None = None,
+        cache_max_bytes: int = 32 * 1024 * 1024,
+    ):
+        super().__init__(
+            session,
+            base_url,
+            [api_keys] if isinstance(api_keys, str) else api_keys,
+            cache_ttls=CACHE_TTLS,
+            stale_grace=STALE_GRACE,
+            disk_cache=disk_cache,
+            cache_max_bytes=cache_max_bytes,
+            requests_per_second=requests_per_second,
+            hedge=True,
+            negative_ttl=NOT_FOUND_TTL,
+        )
+
+    def _auth_headers(self, api_key: str) -> dict[str, str]:
+        return {"Authorization": f"Bearer {api_key}"}
 
-    async def clan(self, clan_tag: str) -> dict:
+    async def clan(self, clan_tag: str) -> Clan:
         try:
-            return await self.get_json(f"/clans/%23{normalize_tag(clan_tag)}")
+            return await self.get_json(f"/clans/%23{normalize_tag(clan_tag)}", schema=Clan)
         except NotFoundError:
             raise ClanNotFound() from None
 
     async def clan_members(self, clan_tag: str) -> list[ClanMember]:
-        try:
-            data = await self.get_json(f"/clans/%23{normalize_tag(clan_tag)}/members", params={"limit": 50})
-        except NotFoundError:
-            raise ClanNotFound() from None
-        return [
-            ClanMember(tag=normalize_tag(m["tag"]), name=m["name"], role=m["role"])
-            for m in data.get("items", [])
-        ]
+        """Current members, from the (cached) clan payload: no separate /members request."""
+        return members_of(await self.clan(clan_tag))
 
     async def clan_exists(self, clan_tag: str) -> bool:
         try:
@@ -73,115 +172,339 @@ class ClashRoyaleClient(BaseAPIClient):
         except ClanNotFound:
             return False
 
-    async def current_river_race(self, clan_tag: str) -> dict | None:
+    async def current_river_race(self, clan_tag: str) -> RiverRace | None:
         """The in-progress river race, or None if the clan has no current race."""
         try:
-            return await self.get_json(f"/clans/%23{normalize_tag(clan_tag)}/currentriverrace")
+            return await self.get_json(f"/clans/%23{normalize_tag(clan_tag)}/currentriverrace", schema=RiverRace)
         except NotFoundError:
             return None
 
     async def river_race_log(self, clan_tag: str, limit: int = 10) -> "WarHistory":
-        """Finished river races, most recent first (war 1 = last finished war)."""
+        """Finished river races, most recent first (war 1 = last finished war).
+
+        The cache holds the (read-only) WarHistory itself, so every command
+        reading the log while it is cached shares one history, counted against
+        the cache's byte budget and evicted with it.
+        """
+        tag = normalize_tag(clan_tag)
+        history = Projection(RaceLog, HistoryOf(tag), size=war_history_size)
         try:
-            data = await self.get_json(f"/clans/%23{normalize_tag(clan_tag)}/riverracelog", params={"limit": limit})
+            return await self.get_json(f"/clans/%23{tag}/riverracelog", params={"limit": limit}, schema=history)
         except NotFoundError:
-            return WarHistory([])
-        return WarHistory(data.get("items", []))
+            return WarHistory([], tag)
 
-    async def player(self, player_tag: str) -> dict:
+    async def player(self, player_tag: str) -> PlayerSummary:
         try:
-            return await self.get_json(f"/players/%23{normalize_tag(player_tag)}")
+            return await self.get_json(f"/players/%23{normalize_tag(player_tag)}", schema=PLAYER_SUMMARY)
         except NotFoundError:
             raise PlayerNotFound() from None
 
     async def tournament(self, tournament_tag: str) -> tuple[str, list[TournamentPlayer]]:
         try:
-            data = await self.get_json(f"/tournaments/%23{normalize_tag(tournament_tag)}")
+            data = await self.get_json(f"/tournaments/%23{normalize_tag(tournament_tag)}", schema=Tournament)
         except NotFoundError:
             raise TournamentNotFound() from None
-        players = [
-            TournamentPlayer(name=p["name"], score=p["score"], rank=p["rank"])
-            for p in data.get("membersList", [])
-        ]
-        return data.get("name", "Unknown Tournament"), players
+        players = [TournamentPlayer(name=p.name, score=p.score, rank=p.rank) for p in data.members_list]
+        return data.name, players
+
+    async def player_dossier(self, player_tag: str, clan_hint: str | None = None) -> "PlayerDossier":
+        """A player with their clan's current race and war log, in about two round trips instead of three.
+
+        The clan fetches start before the player arrives when the clan can be
+        guessed: from ``clan_hint`` (e.g. an account list the caller already
+        showed) or from a cached copy of the player. Once the player shows a
+        wrong guess, it is abandoned before the right clan is fetched; requests
+        it already started still complete upstream (other callers may share
+        them) and get cached.
+        """
+        tag = normalize_tag(player_tag)
+        if clan_hint is None:
+            cached = self.peek(f"/players/%23{tag}", schema=PLAYER_SUMMARY)
+            clan_hint = cached.clan.tag if cached is not None and cached.clan is not None else None
+        guess = normalize_tag(clan_hint) if clan_hint else None
+
+        speculative = asyncio.ensure_future(self.clan_snapshot(guess, clan=False)) if guess else None
+        try:
+            player = await self.player(tag)
+            clan_tag = normalize_tag(player.clan.tag) if player.clan is not None else None
+            if speculative is not None and clan_tag != guess:
+                speculative.cancel()
+            if clan_tag is None:
+                return PlayerDossier(tag, player, None)
+            if clan_tag == guess:
+                return PlayerDossier(tag, player, await speculative)
+            return PlayerDossier(tag, player, await self.clan_snapshot(clan_tag, clan=False))
+        finally:
+            if speculative is not None:
+                speculative.cancel()  # no-op if it already finished
+                if speculative.done() and not speculative.cancelled():
+                    speculative.exception()  # a wrong guess may have failed; nobody else will look
+
+    async def clan_snapshot(self, clan_tag: str, *, clan: bool = True, race: bool = True,
+                            war_log: bool = True) -> "ClanSnapshot":
+        """The requested parts of a clan, fetched concurrently; parts not requested are left empty."""
+        tag = normalize_tag(clan_tag)
+
+        async def nothing() -> None:
+            return None
+
+        clan_data, current_race, history = await asyncio.gather(
+            self.clan(tag) if clan else nothing(),
+            self.current_river_race(tag) if race else nothing(),
+            self.river_race_log(tag) if war_log else nothing(),
+        )
+        return ClanSnapshot.build(tag, clan_data, current_race, history)
 
 
 # ---- In-memory war-log computations (no extra API calls) ----
 
-def race_participants(race: dict | None) -> dict[str, dict]:
+def members_of(clan: Clan) -> list[ClanMember]:
+    """Members listed in a /clans/{tag} response (its ``memberList`` has all 50 slots)."""
+    return [ClanMember(tag=normalize_tag(m.tag), name=m.name, role=m.role) for m in clan.member_list]
+
+
+def race_participants(race: RiverRace | None) -> dict[Tag, RaceParticipant]:
     """Participants of the clan's current river race, keyed by normalized tag."""
-    if not race:
+    if race is None:
         return {}
-    return {normalize_tag(p["tag"]): p for p in race.get("clan", {}).get("participants", [])}
+    return {normalize_tag(p.tag): p for p in race.clan.participants}
 
 
-def former_member_tags(race: dict | None, members: list[ClanMember]) -> dict[str, str]:
+def former_member_tags(race: RiverRace | None, members: list[ClanMember]) -> dict[Tag, str]:
     """Race participants who are no longer in the clan: {normalized_tag: name}."""
     current = {m.tag for m in members}
     return {
-        tag: participant.get("name", "Unknown")
+        tag: participant.name
         for tag, participant in race_participants(race).items()
         if tag not in current
     }
 
 
+@dataclass(frozen=True, slots=True)
+class ClanSnapshot:
+    """One clan's metadata, members, current race and war log, with the usual lookups precomputed."""
+
+    tag: Tag
+    clan: Clan  # empty if not requested
+    members: list[ClanMember]
+    race: RiverRace | None
+    history: "WarHistory"
+    participants: dict[Tag, RaceParticipant]  # current race
+    former: dict[Tag, str]  # current race participants no longer in the clan: {tag: name}
+
+    @classmethod
+    def build(cls, tag: Tag, clan: Clan | None, race: RiverRace | None,
+              history: "WarHistory | None") -> "ClanSnapshot":
+        members = members_of(clan) if clan is not None else []
+        return cls(
+            tag=tag,
+            clan=clan if clan is not None else Clan(),
+            members=members,
+            race=race,
+            history=history if history is not None else WarHistory([], tag),
+            participants=race_participants(race),
+            former=former_member_tags(race, members) if clan is not None else {},
+        )
+
+    @property
+    def name(self) -> str:
+        return self.clan.name or f"#{self.tag}"
+
+
+@dataclass(frozen=True, slots=True)
+class PlayerDossier:
+    tag: Tag
+    player: PlayerSummary
+    clan: ClanSnapshot | None  # race and war log of the player's clan (no clan metadata); None if clanless
+
+    def war_stats(self) -> tuple[int, int, int, int]:
+        """(current fame, current decks used, last war fame, last war decks used)."""
+        if self.clan is None:
+            return 0, 0, 0, 0
+        participant = self.clan.participants.get(self.tag)
+        current = (participant.fame, participant.decks_used) if participant else (0, 0)
+        return (*current, self.clan.history.fame(self.tag, 1), self.clan.history.decks_used(self.tag, 1))
+
+
+@dataclass(frozen=True, slots=True)
+class MemberWarStats:
+    """One member's aggregates over a WarHistory. War numbers count backwards; 0 = never fought."""
+
+    weeks: int  # consecutive wars from war 1, i.e. weeks_in_clan
+    fame: int  # total over every war in the history
+    average_fame: float  # over the current streak only
+    decks_used: int  # total over every war in the history
+    first_war: int  # oldest war fought in
+    last_war: int  # most recent war fought in
+
+
 class WarHistory:
     """Finished river races for a clan, with per-war participant lookups.
 
     War numbers count backwards: war 1 is the most recently finished war.
+    Member lookups take canonical tags (``normalize_tag``) and don't re-normalize.
+    Only ``clan_tag``'s own participants are indexed (every clan's, if no tag
+    is given); the other clans in each race are available through
+    ``race_standings``, built on first use.
+
+    Fame, decks used and presence are also kept as members x wars matrices
+    (column 0 = war 1), so whole-clan questions — ``weeks_in_clan_of``,
+    ``average_fame_of``, ``fame_matrix`` — are single array operations.
+    Tags that never fought map to an extra all-zero row.
+
+    Per-member aggregates (``MemberWarStats``) are computed once, when the
+    history is built, so every per-member accessor is a lookup. A history is
+    read-only after construction and can be shared between commands.
     """
 
-    def __init__(self, log_items: list[dict]):
-        log_items = sorted(
-            log_items,
-            key=lambda item: (item.get("seasonId", 0), item.get("sectionIndex", 0)),
-            reverse=True,
-        )
-        self._participants_by_war: list[dict[str, dict]] = []
-        for item in log_items:
-            participants: dict[str, dict] = {}
-            for standing in item.get("standings", []):
-                for player in standing.get("clan", {}).get("participants", []):
-                    participants[normalize_tag(player["tag"])] = player
-            self._participants_by_war.append(participants)
+    def __init__(self, log_items: list[RaceLogItem], clan_tag: str | None = None):
+        self.clan_tag = normalize_tag(clan_tag) if clan_tag else None
+        self._log_items = sorted(log_items, key=lambda item: (item.season_id, item.section_index), reverse=True)
+        # Participant dicts per war, only for callers that ask (``participants``/``race_standings``).
+        self._participants_by_war: dict[int, dict[Tag, RaceParticipant]] = {}
+        self._standings_by_war: dict[int, dict[Tag, dict[Tag, RaceParticipant]]] = {}
+
+        self._rows: dict[Tag, int] = {}
+        cells: list[tuple[int, int, int, int]] = []  # (row, war column, fame, decks used)
+        for column, item in enumerate(self._log_items):
+            for tag, participant in self._own_participants(item).items():
+                row = self._rows.setdefault(tag, len(self._rows))
+                cells.append((row, column, participant.fame, participant.decks_used))
+        shape = (len(self._rows) + 1, len(self._log_items))
+        self._fame = np.zeros(shape, dtype=np.int32)
+        self._decks = np.zeros(shape, dtype=np.int32)
+        self._present = np.zeros(shape, dtype=bool)
+        if cells:
+            rows, columns, fame, decks = np.array(cells, dtype=np.int32).T
+            self._fame[rows, columns] = fame
+            self._decks[rows, columns] = decks
+            self._present[rows, columns] = True
+        self._build_aggregates()
+
+    def _build_aggregates(self) -> None:
+        wars = len(self._log_items)
+        in_streak = np.cumprod(self._present, axis=1).astype(bool)  # consecutive wars from war 1
+        self._streaks = in_streak.sum(axis=1)
+        self._averages = np.divide(np.where(in_streak, self._fame, 0).sum(axis=1), self._streaks,
+                                   out=np.zeros(len(self._streaks)), where=self._streaks > 0)
+        seen = self._present.any(axis=1)
+        if wars:
+            last_war = np.where(seen, self._present.argmax(axis=1) + 1, 0)
+            first_war = np.where(seen, wars - self._present[:, ::-1].argmax(axis=1), 0)
+        else:
+            last_war = first_war = np.zeros(len(seen), dtype=np.intp)
+        for array in (self._fame, self._decks, self._present, self._streaks, self._averages):
+            array.flags.writeable = False
+
+        self._stats = [
+            MemberWarStats(*values)
+            for values in zip(self._streaks.tolist(), self._fame.sum(axis=1).tolist(), self._averages.tolist(),
+                              self._decks.sum(axis=1).tolist(), first_war.tolist(), last_war.tolist(),
+                              strict=True)
+        ]
 
-    def __len__(self) -> int:
-        return len(self._participants_by_war)
+    def _own_participants(self, item: RaceLogItem) -> dict[Tag, RaceParticipant]:
+        participants: dict[Tag, RaceParticipant] = {}
+        for standing in item.standings:
+            if self.clan_tag is not None and normalize_tag(standing.clan.tag) != self.clan_tag:
+                continue
+            for player in standing.clan.participants:
+                participants[normalize_tag(player.tag)] = player
+        return participants
 
-    def participants(self, n: int) -> dict[str, dict]:
-        """Participants n wars ago (across all clans in that race); {} if out of range."""
-        if 1 <= n <= len(self._participants_by_war):
-            return self._participants_by_war[n - 1]
-        return {}
+    def _row(self, member_tag: Tag) -> int:
+        return self._rows.get(member_tag, len(self._rows))
 
-    def fame(self, member_tag: str, n: int) -> int:
-        return int(self.participants(n).get(normalize_tag(member_tag), {}).get("fame", 0))
+    def _rows_of(self, member_tags: Sequence[Tag]) -> np.ndarray:
+        return np.fromiter((self._row(tag) for tag in member_tags), dtype=np.intp, count=len(member_tags))
 
-    def decks_used(self, member_tag: str, n: int) -> int:
-        return int(self.participants(n).get(normalize_tag(member_tag), {}).get("decksUsed", 0))
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the index, on top of the race log it was built from."""
+        arrays = (self._fame, self._decks, self._present, self._streaks, self._averages)
+        return (sum(array.nbytes for array in arrays) + sys.getsizeof(self._rows)
+                + sum(map(sys.getsizeof, self._stats)))
 
-    def weeks_in_clan(self, member_tag: str) -> int:
+    def __len__(self) -> int:
+        return len(self._log_items)
+
+    def participants(self, n: int) -> dict[Tag, RaceParticipant]:
+        """The clan's participants n wars ago; {} if out of range."""
+        if not 1 <= n <= len(self):
+            return {}
+        if n not in self._participants_by_war:
+            self._participants_by_war[n] = self._own_participants(self._log_items[n - 1])
+        return self._participants_by_war[n]
+
+    def race_standings(self, n: int) -> dict[Tag, dict[Tag, RaceParticipant]]:
+        """Every clan in the race n wars ago: {clan tag: {player tag: participant}}; {} if out of range."""
+        if not 1 <= n <= len(self._log_items):
+            return {}
+        if n not in self._standings_by_war:
+            self._standings_by_war[n] = {
+                normalize_tag(standing.clan.tag): {normalize_tag(p.tag): p for p in standing.clan.participants}
+                for standing in self._log_items[n - 1].standings
+            }
+        return self._standings_by_war[n]
+
+    def stats(self, member_tag: Tag) -> "MemberWarStats":
+        """All of a member's aggregates; zeros for a tag that never fought."""
+        return self._stats[self._row(member_tag)]
+
+    def fame(self, member_tag: Tag, n: int) -> int:
+        return int(self._fame[self._row(member_tag), n - 1]) if 1 <= n <= len(self) else 0
+
+    def decks_used(self, member_tag: Tag, n: int) -> int:
+        return int(self._decks[self._row(member_tag), n - 1]) if 1 <= n <= len(self) else 0
+
+    def weeks_in_clan(self, member_tag: Tag) -> int:
         """Consecutive wars (from the most recent) the member appears in.
 
         0 means the member joined after the last war ended ("new member").
         """
-        tag = normalize_tag(member_tag)
-        weeks = 0
-        for n in range(1, len(self._participants_by_war) + 1):
-            if tag not in self._participants_by_war[n - 1]:
-                break
-            weeks = n
-        return weeks
-
-    def is_new_member(self, member_tag: str) -> bool:
-        return self.weeks_in_clan(member_tag) == 0
-
-    def fame_history(self, member_tag: str, weeks: int) -> list[int]:
+        return self.stats(member_tag).weeks
+
+    def is_new_member(self, member_tag: Tag) -> bool:
+        return self.stats(member_tag).weeks == 0
+
+    def fame_history(self, member_tag: Tag, weeks: int) -> list[int]:
         """Fame per war for wars 1..weeks ago (most recent first)."""
-        return [self.fame(member_tag, n) for n in range(1, weeks + 1)]
+        history = self._fame[self._row(member_tag), :max(weeks, 0)].tolist()
+        return history + [0] * (weeks - len(history))
+
+    def average_fame(self, member_tag: Tag) -> float:
+        return self.stats(member_tag).average_fame
+
+    def weeks_in_clan_of(self, member_tags: Sequence[Tag]) -> np.ndarray:
+        """``weeks_in_clan`` for each tag, as one int array."""
+        return self._streaks[self._rows_of(member_tags)]
+
+    def fame_matrix(self, member_tags: Sequence[Tag], weeks: int) -> np.ndarray:
+        """Fame per tag (rows) for wars 1..weeks ago (columns); wars out of range are 0."""
+        matrix = np.zeros((len(member_tags), max(weeks, 0)), dtype=np.int32)
+        available = min(max(weeks, 0), len(self))
+        matrix[:, :available] = self._fame[self._rows_of(member_tags), :available]
+        return matrix
+
+    def average_fame_of(self, member_tags: Sequence[Tag]) -> np.ndarray:
+        """Average fame over each member's current streak in the clan; 0.0 for new members."""
+        return self._averages[self._rows_of(member_tags)]
+
+
+@dataclass(frozen=True, slots=True)
+class HistoryOf:
+    """``Projection.build`` turning a race log into the clan's WarHistory.
+
+    Equal for equal tags (unlike a ``partial``), so every call for one clan
+    shares the cache entry and the in-flight request.
+    """
+
+    clan_tag: Tag
+
+    def __call__(self, log: RaceLog) -> WarHistory:
+        return WarHistory(log.items, self.clan_tag)
+
 
-    def average_fame(self, member_tag: str) -> float:
-        weeks = self.weeks_in_clan(member_tag)
-        if weeks == 0:
-            return 0.0
-        return sum(self.fame_history(member_tag, weeks)) / weeks
+def war_history_size(history: WarHistory, body: bytes) -> int:
+    """Cache size of a WarHistory: the decoded log it keeps for ``race_standings``, plus its index."""
+    return estimate_size(body, typed=True) + history.nbytes
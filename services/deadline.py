@@ -0,0 +1,50 @@
+"""Time budgets for API calls, carried in a context variable.
+
+A slash command's user gives up long before the session's 30-second timeout,
+so every command gets ``INTERACTIVE_BUDGET`` seconds from the moment it
+starts (set by the bot's command tree). ``BaseAPIClient`` shrinks each call's
+timeout to whatever is left and fails with ``DeadlineExceeded`` instead of
+finishing work nobody will see. Background loops wrap each unit of work in
+``deadline()`` with their own, longer budgets.
+"""
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+INTERACTIVE_BUDGET = 12.0  # per slash command, from the moment it starts
+SCHEDULED_BUDGET = 30.0  # per war reminder delivery
+BACKGROUND_BUDGET = 60.0  # per clan in the recruit poll
+
+_deadline: ContextVar[float | None] = ContextVar("deadline", default=None)  # time.monotonic()
+
+
+def _tightened(seconds: float) -> float:
+    current = _deadline.get()
+    candidate = time.monotonic() + seconds
+    return candidate if current is None else min(current, candidate)
+
+
+@contextmanager
+def deadline(seconds: float) -> Iterator[None]:
+    """API calls inside the block (and tasks it spawns) must finish within ``seconds``.
+
+    Nested budgets can only shorten an enclosing one, never extend it.
+    """
+    token = _deadline.set(_tightened(seconds))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def start_deadline(seconds: float) -> None:
+    """Like ``deadline()`` for the rest of the current task, e.g. one interaction's handler."""
+    _deadline.set(_tightened(seconds))
+
+
+def time_left() -> float | None:
+    """Seconds until the current deadline (may be negative), or None if there is none."""
+    current = _deadline.get()
+    return None if current is None else current - time.monotonic()
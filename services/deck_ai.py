@@ -7,13 +7,22 @@ from errors import BotError
 from services.http import BaseAPIClient, NotFoundError
 
 BASE_URL = "https://deckai.app/api"
+DEFAULT_REQUESTS_PER_SECOND = 2.0
 
 
 class DeckAIClient(BaseAPIClient):
-    def __init__(self, session: aiohttp.ClientSession, api_key: str | None):
-        super().__init__(session, BASE_URL, {"api-key": api_key or ""})
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        api_key: str | None,
+        requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND,
+    ):
+        super().__init__(session, BASE_URL, [api_key or ""], requests_per_second=requests_per_second)
         self._configured = bool(api_key)
 
+    def _auth_headers(self, api_key: str) -> dict[str, str]:
+        return {"api-key": api_key}
+
     async def clan_war_spy(self, account_id: str, opponent_player_tag: str) -> dict | None:
         """Opponent war-deck intel from DeckAI. None if DeckAI has no data for that player."""
         if not self._configured:
@@ -52,7 +61,7 @@ class DeckAIClient(BaseAPIClient):
 
 # ---- Deck-availability and matchup math (pure, no I/O) ----
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class DeckRecommendation:
     player_deck_index: int
     average_win_rate: float
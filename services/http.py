@@ -1,13 +1,42 @@
+import asyncio
 import logging
+import re
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable, Iterator, Sequence
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
+from functools import partial
 from typing import Any
+from urllib.parse import urlencode
 
 import aiohttp
+import msgspec
 from cachetools import TTLCache
 
-from errors import APIUnavailable, RateLimited
+from db.response_cache import ResponseCache
+from errors import APIDown, APIUnavailable, DeadlineExceeded, RateLimited
+from services import bulk
+from services.breaker import BreakerStatus, CircuitBreaker
+from services.cache import PROJECTION_SIZE, CachedResponse, FamilyStats, MemoryCache, estimate_size
+from services.deadline import time_left
+from services.keypool import APIKey, KeyPool, KeyUsage
+from services.ratelimit import LaneStats, Priority, SharedPriority, current_priority, parse_retry_after
+from services.retry import RETRYABLE_STATUSES, LatencyTracker, RetryBudget, backoff_delay
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_RETRY_AFTER = 1.0  # seconds to back off on a 429 without a Retry-After header
+MAX_RETRY_WAIT = 10.0  # longer Retry-After values fail the request instead of holding it
+REJECTED_KEY_COOLDOWN = 300.0  # seconds a key that got a 403 stays out of rotation
+RETRY_MAX_DELAY = 2.0  # cap on the backoff before one retry of a transient failure
+HEDGE_PERCENTILE = 0.95  # a request slower than this share of recent ones gets a hedged duplicate
+
+# A cache TTL in seconds, or a function returning one at insertion time.
+CacheTTL = float | Callable[[], float]
+
 
 class NotFoundError(Exception):
     """Raised on HTTP 404. Clients translate this into a typed BotError or None.
@@ -21,26 +50,227 @@ class NotFoundError(Exception):
         self.body = body
 
 
+_CACHE_DIRECTIVE = re.compile(r'(?P<name>[^\s,=]+)(?:\s*=\s*(?P<value>"[^"]*"|[^\s,]*))?')
+
+
+def ttl_from_headers(headers: Any) -> float | None:
+    """Freshness lifetime the upstream declared for a response, or None if it didn't say.
+
+    Reads ``Cache-Control`` (``no-store``/``no-cache`` => 0, ``s-maxage``,
+    ``max-age``, minus ``Age``), falling back to ``Expires`` relative to
+    ``Date``. Directives may be separated by commas or just whitespace: the
+    Clash Royale API sends ``public max-age=600``.
+    """
+    directives = {
+        match["name"].lower(): (match["value"] or "").strip('"')
+        for match in _CACHE_DIRECTIVE.finditer(headers.get("Cache-Control", ""))
+    }
+
+    if "no-store" in directives or "no-cache" in directives:
+        return 0.0
+    for name in ("s-maxage", "max-age"):
+        if name in directives:
+            try:
+                max_age = float(directives[name])
+                age = float(headers.get("Age", 0))
+            except ValueError:
+                continue
+            return max(0.0, max_age - age)
+
+    if "Expires" in headers:
+        try:
+            expires = parsedate_to_datetime(headers["Expires"])
+            date = parsedate_to_datetime(headers["Date"]) if "Date" in headers else datetime.now(UTC)
+        except (TypeError, ValueError):
+            return 0.0  # an invalid Expires means "already expired"
+        return max(0.0, (expires - date).total_seconds())
+    return None
+
+
+@dataclass(frozen=True)
+class _Reply:
+    key: APIKey
+    status: int
+    headers: Any
+    body: bytes
+
+
+class _Unreachable(Exception):
+    """No HTTP answer at all: timeout or connection error."""
+
+
+@dataclass(frozen=True)
+class Projection:
+    """Pass as ``schema`` to cache ``build(decoded)`` instead of the decoded response itself.
+
+    For endpoints whose payload is far bigger than what the bot reads (every
+    card and achievement of a player), so only the small summary stays in memory.
+    ``size(built, body)`` estimates the bytes the cached result holds; without
+    it, every projection counts as ``PROJECTION_SIZE``.
+    """
+
+    schema: type
+    build: Callable[[Any], Any]
+    size: Callable[[Any, bytes], int] | None = None
+
+
+def _decode(body: bytes, schema: type | Projection | None) -> Any:
+    if isinstance(schema, Projection):
+        return schema.build(msgspec.json.decode(body, type=schema.schema))
+    return msgspec.json.decode(body, type=schema) if schema is not None else msgspec.json.decode(body)
+
+
+def _entry_size(body: bytes, schema: type | Projection | None, data: Any) -> int:
+    if isinstance(schema, Projection):
+        return schema.size(data, body) if schema.size is not None else PROJECTION_SIZE
+    return estimate_size(body, typed=schema is not None)
+
+
+class Freshness:
+    """Filled in by every stale response served inside an ``accept_stale()`` block."""
+
+    __slots__ = ("as_of",)
+
+    def __init__(self):
+        self.as_of: datetime | None = None  # fetch time of the oldest stale response served
+
+    def _served_stale(self, fetched_at: datetime) -> None:
+        self.as_of = fetched_at if self.as_of is None else min(self.as_of, fetched_at)
+
+
+_freshness: ContextVar[Freshness | None] = ContextVar("freshness", default=None)
+
+
+@contextmanager
+def accept_stale() -> Iterator[Freshness]:
+    """Opt API calls in the block into stale-while-revalidate.
+
+    An expired cache entry still inside the client's ``stale_grace`` window is
+    returned at once while one background request refreshes it. The yielded
+    ``Freshness`` says how old the oldest such response was, so the command can
+    show an "as of" note.
+    """
+    freshness = Freshness()
+    token = _freshness.set(freshness)
+    try:
+        yield freshness
+    finally:
+        _freshness.reset(token)
+
+
 class BaseAPIClient:
     """Shared plumbing for every external HTTP API the bot talks to.
 
-    Owns auth headers and a TTL cache; uses the single aiohttp session created
-    at bot startup. Non-200 responses become typed exceptions instead of being
-    silently swallowed.
+    Owns auth headers and a byte-bounded response cache (``MemoryCache``);
+    uses the single aiohttp session created at bot startup. Non-200
+    responses become typed exceptions instead of being silently swallowed.
+    Passing ``schema`` (a ``msgspec.Struct`` type) to ``get_json`` decodes
+    the body straight into it instead of into dicts; a ``Projection`` there
+    caches a summary built from the decoded body.
+
+    Cache lifetimes come from the upstream's Cache-Control/Expires headers,
+    clamped to ``[min_cache_ttl, max_cache_ttl]``. Responses without them
+    fall back to per-endpoint defaults: ``cache_ttls`` maps path regexes to
+    TTLs (first match wins) and ``cache_ttl`` covers every other path. A
+    rule given as a function (e.g. the war calendar) knows more than the
+    headers do, so for its paths the longer of the two wins. Expired
+    entries are kept for another ``stale_grace`` seconds for callers inside
+    ``accept_stale()``. With a ``disk_cache``, every cached response is also
+    written to disk and read back on a memory miss, so restarts start warm.
+
+    Concurrent requests for the same path, params and schema are coalesced:
+    the first caller starts the upstream request and everyone else awaits its
+    result (or its exception). Successful responses are cached as above, per
+    schema, so a raw read never hands a dict to a typed caller (the disk
+    cache keeps the raw body and serves every schema); 404s go to a
+    separate negative cache (``negative_ttl`` seconds, ``negative_cache_size``
+    entries) so a mistyped or dead tag isn't looked up again on every retry.
+
+    Every request first takes a token from one API key's ``TokenBucket``
+    (the key with the most budget left; see ``KeyPool``). A 429 benches that
+    key for the upstream Retry-After and a 403 (in a pool of several keys) for
+    ``REJECTED_KEY_COOLDOWN``; the request is then retried once on another
+    key, or on the same key if the wait is short. Otherwise the caller gets ``RateLimited``/``APIUnavailable``.
+    Tokens go to the highest-priority lane first (see ``request_priority``); a
+    coalesced request is queued in the lane of its most urgent waiter.
+
+    A ``CircuitBreaker`` watches for timeouts, connection errors and 5xx: after
+    ``failure_threshold`` in a row, requests fail at once with ``APIDown``
+    for ``breaker_cooldown`` seconds instead of each waiting out the timeout.
+
+    Timeouts, connection errors and 502/503/504 are retried up to
+    ``max_retries`` times with jittered exponential backoff, as long as the
+    shared ``RetryBudget`` allows and the breaker is closed. With ``hedge``, a
+    request slower than the recent p95 gets a duplicate on the budget too.
+
+    ``get_many``/``map_concurrent``/``as_completed`` fan out over many paths or
+    tags with at most ``fan_out`` calls in flight, so a big batch doesn't queue
+    ahead of every other command on the rate limiter.
+
+    Calls made under a deadline (see ``services.deadline``) wait for a token and
+    the response only as long as the deadline allows, then raise
+    ``DeadlineExceeded``. The upstream request itself runs under the deadline of
+    the caller that started it and is cancelled once that passes.
     """
 
     def __init__(
         self,
         session: aiohttp.ClientSession,
         base_url: str,
-        headers: dict[str, str] | None = None,
+        api_keys: Sequence[str] = ("",),
         cache_ttl: int = 60,
-        cache_size: int = 2048,
+        cache_ttls: Sequence[tuple[str, CacheTTL]] = (),
+        min_cache_ttl: float = 10,
+        max_cache_ttl: float = 24 * 3600,
+        cache_max_bytes: int = 32 * 1024 * 1024,
+        stale_grace: float = 0,
+        disk_cache: ResponseCache | None = None,
+        requests_per_second: float = 10.0,
+        failure_threshold: int = 5,
+        breaker_cooldown: float = 30.0,
+        max_retries: int = 2,
+        retry_base_delay: float = 0.25,
+        hedge: bool = False,
+        fan_out: int = 8,
+        negative_ttl: float = 60,
+        negative_cache_size: int = 1024,
     ):
         self._session = session
         self._base_url = base_url.rstrip("/")
-        self._headers = headers or {}
-        self._cache: TTLCache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+        self._keys = KeyPool(api_keys, requests_per_second)
+        self._default_ttl = cache_ttl
+        self._ttl_rules = [(re.compile(pattern), ttl) for pattern, ttl in cache_ttls]
+        self._ttl_bounds = (min_cache_ttl, max_cache_ttl)
+        self._disk_cache = disk_cache
+        self._disk_writes: set[asyncio.Task] = set()
+        self._cache = MemoryCache(cache_max_bytes, grace=stale_grace)
+        self._in_flight: dict[tuple, tuple[asyncio.Future, SharedPriority]] = {}
+        self._breaker = CircuitBreaker(failure_threshold, breaker_cooldown)
+        self._max_retries = max_retries
+        self._retry_base_delay = retry_base_delay
+        self._retry_budget = RetryBudget()
+        self._hedge = hedge
+        self._latency = LatencyTracker()
+        self._fan_out = fan_out
+        self._not_found: TTLCache[tuple, str] = TTLCache(negative_cache_size, negative_ttl)  # 404 bodies
+
+    def cache_ttl(self, path: str, headers: Any = None) -> float:
+        """Seconds a response for ``path`` (with response ``headers``) stays fresh if stored now."""
+        declared = ttl_from_headers(headers) if headers is not None else None
+        if declared is not None:
+            low, high = self._ttl_bounds
+            declared = max(low, min(high, declared))
+        rule = next((ttl for pattern, ttl in self._ttl_rules if pattern.match(path)), None)
+        if callable(rule):
+            computed = rule()
+            return computed if declared is None else max(computed, declared)
+        if declared is not None:
+            return declared
+        return rule if rule is not None else self._default_ttl
+
+    def _auth_headers(self, api_key: str) -> dict[str, str]:
+        """Headers that authenticate a request with ``api_key``. Subclasses override."""
+        return {}
 
     async def get_json(
         self,
@@ -48,28 +278,333 @@ class BaseAPIClient:
         *,
         params: dict[str, Any] | None = None,
         use_cache: bool = True,
+        schema: type | Projection | None = None,
     ) -> Any:
-        cache_key = (path, tuple(sorted((params or {}).items())))
-        if use_cache and cache_key in self._cache:
-            return self._cache[cache_key]
+        request_key = (path, tuple(sorted((params or {}).items())))
+        cache_key = (*request_key, schema)
+        if use_cache and request_key in self._not_found:
+            raise NotFoundError(f"{self._base_url}{path}", self._not_found[request_key])
+        entry = self._cache.get(cache_key) if use_cache else None
+        if entry is None and use_cache and self._disk_cache is not None:
+            entry = await self._load_from_disk(cache_key, schema)
+        if entry is not None:
+            if time.monotonic() < entry.fresh_until:
+                self._cache.record_lookup(cache_key, hit=True)
+                return entry.data
+            freshness = _freshness.get()
+            if freshness is not None:
+                self._cache.record_lookup(cache_key, hit=True)
+                self._start_fetch(cache_key, path, params, True, schema)  # revalidate in the background
+                freshness._served_stale(entry.fetched_at)
+                return entry.data
+        if use_cache:
+            self._cache.record_lookup(cache_key, hit=False)  # going upstream, even if a stale entry exists
 
-        url = f"{self._base_url}{path}"
+        left = time_left()
+        if left is not None and left <= 0:
+            raise DeadlineExceeded()
+        fetch = self._start_fetch(cache_key, path, params, use_cache, schema)
+        try:
+            async with asyncio.timeout(left):
+                # Shield so one waiter giving up doesn't cancel the request for the rest.
+                return await asyncio.shield(fetch)
+        except TimeoutError:
+            raise DeadlineExceeded() from None
+
+    def peek(self, path: str, *, params: dict[str, Any] | None = None,
+             schema: type | Projection | None = None) -> Any:
+        """Whatever the memory cache holds for ``path``, fresh or stale, without any request; None if nothing.
+
+        For guesses that a later ``get_json`` confirms, e.g. which clan a player was in last time.
+        """
+        entry = self._cache.peek((path, tuple(sorted((params or {}).items())), schema))
+        return entry.data if entry is not None else None
+
+    async def get_many(self, paths: Iterable[str], *, schema: type | Projection | None = None,
+                       limit: int | None = None) -> list[bulk.BulkResult]:
+        """``get_json`` for every path, ``fan_out`` at a time; one ``BulkResult`` per path, in order.
+
+        Without ``schema`` the values are raw dicts, cached apart from typed reads of the same paths.
+        """
+        return await self.map_concurrent(partial(self.get_json, schema=schema), paths, limit=limit)
+
+    async def map_concurrent(self, func: Callable[[Any], Awaitable[Any]], items: Iterable[Any], *,
+                             limit: int | None = None) -> list[bulk.BulkResult]:
+        """``func(item)`` for every item (e.g. ``client.clan`` over tags), in order, with per-item errors."""
+        return await bulk.map_concurrent(func, items, limit or self._fan_out)
+
+    def as_completed(self, func: Callable[[Any], Awaitable[Any]], items: Iterable[Any], *,
+                     limit: int | None = None) -> AsyncIterator[bulk.BulkResult]:
+        """Like ``map_concurrent``, yielding results as they finish."""
+        return bulk.as_completed(func, items, limit or self._fan_out)
+
+    def _disk_key(self, cache_key: tuple) -> str:
+        path, params, _schema = cache_key  # the raw body on disk serves every schema
+        return f"{self._base_url}{path}?{urlencode(params)}"
+
+    async def _load_from_disk(self, cache_key: tuple, schema: type | Projection | None) -> CachedResponse | None:
+        try:
+            stored = await self._disk_cache.get(self._disk_key(cache_key))
+        except Exception:
+            logger.exception("Could not read cached response for %s", cache_key[0])
+            return None
+        if stored is None:
+            return None
+        try:
+            data = _decode(stored.body, schema)
+        except msgspec.DecodeError as exc:  # stored before a schema change, say: treat as a miss
+            logger.warning("Dropping cached response for %s that no longer decodes: %s", cache_key[0], exc)
+            try:
+                await self._disk_cache.delete(self._disk_key(cache_key))
+            except Exception:
+                logger.exception("Could not delete cached response for %s", cache_key[0])
+            return None
+        entry = CachedResponse(
+            data,
+            datetime.fromtimestamp(stored.fetched_at, UTC),
+            time.monotonic() + (stored.expires_at - time.time()),
+            _entry_size(stored.body, schema, data),
+        )
+        current = self._cache.get(cache_key)
+        if current is not None and current.fetched_at >= entry.fetched_at:
+            return current  # a fetch stored a response at least as new while the disk was read
+        self._cache[cache_key] = entry
+        return entry
+
+    def _persist(self, cache_key: tuple, body: bytes, ttl: float) -> None:
+        """Write a fresh response to the disk cache without making callers wait for it."""
+        if self._disk_cache is None:
+            return
+        now = time.time()
+        write = asyncio.create_task(self._disk_cache.put(self._disk_key(cache_key), body, now, now + ttl))
+        self._disk_writes.add(write)
+        write.add_done_callback(self._disk_write_done)
+
+    async def aclose(self) -> None:
+        """Wait for pending disk-cache writes; call before closing the ``disk_cache``."""
+        await asyncio.gather(*self._disk_writes, return_exceptions=True)
+
+    def _disk_write_done(self, write: asyncio.Task) -> None:
+        self._disk_writes.discard(write)
+        if not write.cancelled() and write.exception() is not None:
+            logger.error("Could not persist cached response", exc_info=write.exception())
+
+    def _start_fetch(self, cache_key: tuple, path: str, params: dict[str, Any] | None,
+                     use_cache: bool, schema: type | Projection | None) -> asyncio.Future:
+        """The in-flight request for ``cache_key``, starting one if there is none.
+
+        Joining a request raises it to the caller's lane if that is more urgent.
+        """
+        in_flight = self._in_flight.get(cache_key)
+        if in_flight is not None:
+            fetch, priority = in_flight
+            priority.raise_to(current_priority())
+            return fetch
+        priority = SharedPriority(current_priority())
+        fetch = asyncio.ensure_future(
+            self._fetch(path, params, cache_key if use_cache else None, schema, priority)
+        )
+        self._in_flight[cache_key] = (fetch, priority)
+        fetch.add_done_callback(partial(self._fetch_done, cache_key))
+        return fetch
+
+    def lane_stats(self) -> dict[Priority, LaneStats]:
+        return self._keys.lane_stats()
+
+    def key_usage(self) -> list[KeyUsage]:
+        return self._keys.usage()
+
+    def cache_stats(self) -> dict[str, FamilyStats]:
+        return self._cache.stats()
+
+    @property
+    def is_down(self) -> bool:
+        """Whether the circuit breaker is refusing requests right now."""
+        return self._breaker.is_open
+
+    def breaker_status(self) -> BreakerStatus:
+        return self._breaker.status()
+
+    def log_stats(self) -> None:
+        """One log line each for priority lanes, API keys and the response cache."""
+        name = type(self).__name__
+        logger.info("%s lanes: %s", name, ", ".join(
+            f"{priority.name.lower()} queued={lane.queued} served={lane.served} "
+            f"avg_wait={lane.average_wait:.2f}s max_wait={lane.max_wait:.2f}s"
+            for priority, lane in self.lane_stats().items()
+        ))
+        logger.info("%s keys: %s", name, ", ".join(
+            f"{usage.label} requests={usage.requests} rejections={usage.rejections}"
+            + (f" benched={usage.benched_for:.0f}s" if usage.benched_for else "")
+            for usage in self.key_usage()
+        ))
+        families = ", ".join(
+            f"{family} entries={stats.entries} bytes={stats.bytes} hit_ratio={stats.hit_ratio:.0%}"
+            for family, stats in self.cache_stats().items()
+        )
+        logger.info("%s cache: %d bytes, %d known 404s; %s",
+                    name, self._cache.total_bytes, len(self._not_found), families)
+
+    def _fetch_done(self, cache_key: tuple, fetch: asyncio.Future) -> None:
+        if cache_key in self._in_flight and self._in_flight[cache_key][0] is fetch:
+            del self._in_flight[cache_key]
+        if not fetch.cancelled():
+            fetch.exception()  # mark retrieved even if every waiter was cancelled
+
+    async def _fetch(self, path: str, params: dict[str, Any] | None, cache_key: tuple | None,
+                     schema: type | Projection | None, priority: SharedPriority) -> Any:
+        """One upstream GET, unless the circuit breaker is open."""
+        if self._breaker.is_open:
+            raise APIDown()
+        probe = self._breaker.claim_probe()
         try:
-            async with self._session.get(url, params=params, headers=self._headers) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    if use_cache:
-                        self._cache[cache_key] = data
-                    return data
-
-                body = await response.text()
-                if response.status == 404:
-                    raise NotFoundError(url, body)
-                if response.status == 429:
-                    logger.warning("Rate limited by %s: %s", url, body[:200])
+            # Timing out here cancels _get, which the breaker doesn't count as a failure.
+            async with asyncio.timeout(time_left()):
+                return await self._get(path, params, cache_key, schema, priority)
+        except TimeoutError:
+            raise DeadlineExceeded() from None
+        finally:
+            if probe:
+                self._breaker.abandon_probe()  # no-op if the probe got an answer
+
+    def _upstream_failed(self, url: str) -> None:
+        was_open = self._breaker.is_open
+        self._breaker.record_failure()
+        if not was_open and self._breaker.is_open:
+            logger.warning("%s looks down (last failure: %s); failing fast for %.0fs",
+                           type(self).__name__, url, self._breaker.retry_in)
+
+    async def _get(self, path: str, params: dict[str, Any] | None, cache_key: tuple | None,
+                   schema: type | Projection | None, priority: SharedPriority) -> Any:
+        """Caches the payload under ``cache_key`` unless it is None."""
+        url = f"{self._base_url}{path}"
+        self._retry_budget.record_request()
+        failed_key = None
+        rotated = False
+        retries = 0
+        while True:
+            try:
+                reply = await self._send_hedged(url, params, priority, exclude=failed_key)
+            except _Unreachable as exc:
+                if self._may_retry(retries):
+                    await self._back_off(url, retries, str(exc))
+                    retries += 1
+                    continue
+                raise APIUnavailable() from exc
+
+            key, status = reply.key, reply.status
+            if status == 200:
+                try:
+                    data = _decode(reply.body, schema)
+                except msgspec.DecodeError as exc:
+                    logger.error("Unexpected response from %s: %s", url, exc)
+                    self._upstream_failed(url)
+                    raise APIUnavailable() from exc
+                self._breaker.record_success()
+                if cache_key is not None:
+                    ttl = self.cache_ttl(path, reply.headers)
+                    self._cache[cache_key] = CachedResponse(
+                        data, datetime.now(UTC), time.monotonic() + ttl, _entry_size(reply.body, schema, data)
+                    )
+                    self._persist(cache_key, reply.body, ttl)
+                return data
+
+            body = reply.body.decode(errors="replace")
+            if status >= 500:
+                self._upstream_failed(url)
+            else:
+                self._breaker.record_success()  # a 4xx is still an answer
+            if status == 404:
+                if cache_key is not None:
+                    self._not_found[cache_key[:2]] = body  # whatever the schema
+                raise NotFoundError(url, body)
+            if status in RETRYABLE_STATUSES and self._may_retry(retries):
+                await self._back_off(url, retries, f"HTTP {status}")
+                retries += 1
+                continue
+            if status in (403, 429):
+                if status == 429:
+                    wait = parse_retry_after(reply.headers.get("Retry-After"), DEFAULT_RETRY_AFTER)
+                    logger.warning("Rate limited by %s on key %s (retry after %.1fs): %s",
+                                   url, key.label, wait, body[:200])
+                else:
+                    wait = REJECTED_KEY_COOLDOWN
+                    logger.error("Key %s rejected by %s: %s", key.label, url, body[:200])
+                # A lone rejected key stays usable: benching it would stall every request
+                # for the whole cooldown instead of failing fast.
+                if status == 429 or len(self._keys) > 1:
+                    self._keys.bench(key, wait)
+                failed_key = key
+                if not rotated and (self._keys.has_active(exclude=key) or wait <= MAX_RETRY_WAIT):
+                    rotated = True
+                    continue
+                if status == 429:
                     raise RateLimited()
-                logger.error("HTTP %s from %s: %s", response.status, url, body[:500])
                 raise APIUnavailable()
+            logger.error("HTTP %s from %s: %s", status, url, body[:500])
+            raise APIUnavailable()
+
+    def _may_retry(self, retries: int) -> bool:
+        return retries < self._max_retries and not self._breaker.is_open and self._retry_budget.try_spend()
+
+    async def _back_off(self, url: str, retries: int, reason: str) -> None:
+        delay = backoff_delay(retries, self._retry_base_delay, RETRY_MAX_DELAY)
+        logger.warning("Retrying %s in %.2fs (%s)", url, delay, reason)
+        await asyncio.sleep(delay)
+
+    async def _take_key(self, priority: SharedPriority, exclude: APIKey | None) -> APIKey:
+        """The key with the most budget left, once it has given us a token."""
+        key = self._keys.choose(exclude=exclude)
+        await key.bucket.acquire(priority)
+        key.requests += 1
+        return key
+
+    async def _round_trip(self, key: APIKey, url: str, params: dict[str, Any] | None) -> _Reply:
+        """The GET itself, on a key that already has a token. Raises ``_Unreachable`` if no answer came back."""
+        started = time.monotonic()
+        try:
+            async with self._session.get(url, params=params, headers=self._auth_headers(key.value)) as response:
+                reply = _Reply(key, response.status, response.headers, await response.read())
         except (aiohttp.ClientError, TimeoutError) as exc:
             logger.error("Request to %s failed: %s", url, exc)
-            raise APIUnavailable() from exc
+            self._upstream_failed(url)
+            raise _Unreachable(f"{type(exc).__name__}: {exc}") from exc
+        self._latency.observe(time.monotonic() - started)
+        return reply
+
+    async def _send(self, url: str, params: dict[str, Any] | None, priority: SharedPriority,
+                    exclude: APIKey | None) -> _Reply:
+        """One GET on the key with the most budget left. Raises ``_Unreachable`` if no answer came back."""
+        key = await self._take_key(priority, exclude)
+        return await self._round_trip(key, url, params)
+
+    async def _send_hedged(self, url: str, params: dict[str, Any] | None, priority: SharedPriority,
+                           exclude: APIKey | None) -> _Reply:
+        """``_send``, plus a duplicate if the first is slower than the recent p95 (when hedging is on).
+
+        The hedge timer starts once the first request has its token, so time
+        spent queueing on our own rate limiter never counts as a slow upstream.
+        The first usable reply wins and the other request is cancelled.
+        """
+        hedge_after = self._latency.percentile(HEDGE_PERCENTILE) if self._hedge else None
+        key = await self._take_key(priority, exclude)
+        if hedge_after is None:
+            return await self._round_trip(key, url, params)
+
+        pending = {asyncio.ensure_future(self._round_trip(key, url, params))}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=hedge_after)
+            if not done and self._retry_budget.try_spend():
+                logger.info("Hedging %s after %.2fs", url, hedge_after)
+                pending.add(asyncio.ensure_future(self._send(url, params, priority, exclude)))
+            while True:
+                if not done:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for attempt in done:
+                    usable = attempt.exception() is None and attempt.result().status not in RETRYABLE_STATUSES
+                    if usable or not pending:
+                        return attempt.result()
+                done = set()
+        finally:
+            for attempt in pending:
+                attempt.cancel()
@@ -0,0 +1,85 @@
+"""Pool of API keys for one upstream, each with its own request budget.
+
+Requests go to the key with the most budget left right now, so throughput
+scales with the number of keys registered. A key the upstream rejects (403:
+revoked or not allowed from this IP; 429: over its limit) is benched for a
+while and the pool routes around it.
+"""
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+from services.ratelimit import LaneStats, Priority, TokenBucket
+
+
+@dataclass(frozen=True)
+class KeyUsage:
+    label: str  # last 4 characters only; never log whole keys
+    requests: int
+    rejections: int
+    benched_for: float  # seconds until the key is back in rotation (0 if active)
+
+
+class APIKey:
+    __slots__ = ("value", "bucket", "requests", "rejections")
+
+    def __init__(self, value: str, requests_per_second: float):
+        self.value = value
+        self.bucket = TokenBucket(requests_per_second)
+        self.requests = 0
+        self.rejections = 0
+
+    @property
+    def label(self) -> str:
+        return f"…{self.value[-4:]}" if self.value else "(none)"
+
+
+class KeyPool:
+    def __init__(self, keys: Sequence[str], requests_per_second: float):
+        if not keys:
+            raise ValueError("KeyPool needs at least one key")
+        self._keys = [APIKey(key, requests_per_second) for key in keys]
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def choose(self, exclude: APIKey | None = None) -> APIKey:
+        """The active key with the most remaining budget.
+
+        ``exclude`` skips a key that just failed when another one is available.
+        If every key is benched, returns the one that comes back soonest.
+        """
+        candidates = [key for key in self._keys if key is not exclude] or self._keys
+        active = [key for key in candidates if key.bucket.paused_for == 0]
+        if active:
+            return max(active, key=lambda key: key.bucket.available)
+        return min(candidates, key=lambda key: key.bucket.paused_for)
+
+    def has_active(self, exclude: APIKey | None = None) -> bool:
+        return any(key is not exclude and key.bucket.paused_for == 0 for key in self._keys)
+
+    def bench(self, key: APIKey, seconds: float) -> None:
+        """Take ``key`` out of rotation for ``seconds``."""
+        key.rejections += 1
+        key.bucket.pause(seconds)
+
+    def usage(self) -> list[KeyUsage]:
+        return [
+            KeyUsage(label=key.label, requests=key.requests, rejections=key.rejections,
+                     benched_for=key.bucket.paused_for)
+            for key in self._keys
+        ]
+
+    def lane_stats(self) -> dict[Priority, LaneStats]:
+        """Per-lane stats summed across every key's bucket."""
+        merged: dict[Priority, LaneStats] = {}
+        for priority in Priority:
+            lanes = [key.bucket.stats()[priority] for key in self._keys]
+            served = sum(lane.served for lane in lanes)
+            merged[priority] = LaneStats(
+                queued=sum(lane.queued for lane in lanes),
+                served=served,
+                average_wait=sum(lane.average_wait * lane.served for lane in lanes) / served if served else 0.0,
+                max_wait=max(lane.max_wait for lane in lanes),
+            )
+        return merged
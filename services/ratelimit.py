@@ -0,0 +1,217 @@
+"""Client-side token bucket shared by every request to one upstream API.
+
+Requests wait for a token instead of failing; a 429 from upstream pauses the
+whole bucket for its Retry-After so the background loops back off together
+with the interactive commands instead of hammering a limited key.
+
+When the bucket is saturated, waiters are served by priority lane first and
+arrival order second, so a user's slash command isn't stuck behind a recruit
+poll over every managed clan. Background loops mark their traffic with
+``request_priority(Priority.BACKGROUND)``; anything unmarked is interactive.
+A request several callers wait on queues with a ``SharedPriority``, which
+moves it up to the lane of the most urgent caller that joins.
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from enum import IntEnum
+
+
+class Priority(IntEnum):
+    """Request lanes, highest priority first."""
+
+    INTERACTIVE = 0  # slash commands and button presses, racing Discord's 3s window
+    SCHEDULED = 1  # deliveries due at a specific minute (war reminders)
+    BACKGROUND = 2  # periodic refreshes nobody is waiting on (recruit polling)
+
+
+_current_priority: ContextVar[Priority] = ContextVar("request_priority", default=Priority.INTERACTIVE)
+
+
+@contextmanager
+def request_priority(priority: Priority) -> Iterator[None]:
+    """Run API calls made inside the block (and tasks it spawns) in the given lane."""
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def current_priority() -> Priority:
+    return _current_priority.get()
+
+
+class SharedPriority:
+    """The lane of a request that several callers wait on: the most urgent of theirs.
+
+    ``raise_to`` moves the request up in every bucket it is queued in, so an
+    interactive command that joins a background poll's request doesn't wait
+    in the background lane.
+    """
+
+    __slots__ = ("value", "_queued")
+
+    def __init__(self, priority: Priority):
+        self.value = priority
+        self._queued: list[tuple[TokenBucket, list]] = []  # (bucket, its queue entry)
+
+    def raise_to(self, priority: Priority) -> None:
+        if priority >= self.value:
+            return
+        self.value = priority
+        for bucket, entry in self._queued:
+            bucket._reprioritize(entry, priority)
+
+
+@dataclass(frozen=True)
+class LaneStats:
+    queued: int  # requests waiting for a token right now
+    served: int
+    average_wait: float  # seconds between queueing and getting a token
+    max_wait: float
+
+
+class _LaneCounters:
+    __slots__ = ("queued", "served", "total_wait", "max_wait")
+
+    def __init__(self):
+        self.queued = 0
+        self.served = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+
+class TokenBucket:
+    """Allows ``rate`` requests per second on average, with bursts up to ``capacity``.
+
+    Only the head of the wait queue (lowest lane, then earliest arrival) may
+    take a token; everyone else waits for the head to change.
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._queue: list[list] = []  # heap of [priority, arrival]; the priority may be raised in place
+        self._sequence = itertools.count()
+        self._turn = asyncio.Condition()
+        self._lanes = {priority: _LaneCounters() for priority in Priority}
+        self._wakeups: set[asyncio.Task] = set()
+
+    def _take(self, now: float) -> float:
+        """Take a token if one is available; otherwise seconds until one might be."""
+        if now < self._paused_until:
+            return self._paused_until - now
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    async def acquire(self, priority: Priority | SharedPriority | None = None) -> None:
+        """Wait for a token in ``priority``'s lane (default: the caller's current lane)."""
+        shared = priority if isinstance(priority, SharedPriority) else None
+        if shared is not None:
+            priority = shared.value
+        elif priority is None:
+            priority = current_priority()
+        entry = [priority, next(self._sequence)]
+        queued_at = time.monotonic()
+
+        async with self._turn:
+            heapq.heappush(self._queue, entry)
+            self._lanes[priority].queued += 1
+            if shared is not None:
+                shared._queued.append((self, entry))
+            try:
+                while True:
+                    timeout = None
+                    if self._queue[0] is entry:
+                        timeout = self._take(time.monotonic())
+                        if timeout == 0:
+                            break
+                    # Sleep without holding the lock: a higher lane may queue ahead meanwhile.
+                    try:
+                        await asyncio.wait_for(self._turn.wait(), timeout)
+                    except TimeoutError:
+                        pass
+            finally:
+                if shared is not None:
+                    shared._queued.remove((self, entry))
+                self._queue.remove(entry)
+                heapq.heapify(self._queue)
+                self._lanes[entry[0]].queued -= 1
+                self._turn.notify_all()
+
+        lane = self._lanes[entry[0]]  # the lane it was served in, if it got raised
+        waited = time.monotonic() - queued_at
+        lane.served += 1
+        lane.total_wait += waited
+        lane.max_wait = max(lane.max_wait, waited)
+
+    def _reprioritize(self, entry: list, priority: Priority) -> None:
+        """Move a queued entry up to ``priority`` and let the waiters re-check who's at the head."""
+        self._lanes[entry[0]].queued -= 1
+        self._lanes[priority].queued += 1
+        entry[0] = priority
+        heapq.heapify(self._queue)
+        wakeup = asyncio.ensure_future(self._notify())
+        self._wakeups.add(wakeup)
+        wakeup.add_done_callback(self._wakeups.discard)
+
+    async def _notify(self) -> None:
+        async with self._turn:
+            self._turn.notify_all()
+
+    def pause(self, seconds: float) -> None:
+        """Hold every waiter for ``seconds`` (e.g. upstream Retry-After) and drain the burst."""
+        now = time.monotonic()
+        self._paused_until = max(self._paused_until, now + seconds)
+        self._tokens = 0.0
+        self._updated = max(now, self._paused_until)
+
+    @property
+    def available(self) -> float:
+        """Tokens free right now minus requests already queued for them (may be negative)."""
+        now = time.monotonic()
+        if now < self._paused_until:
+            return -len(self._queue)
+        refilled = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        return refilled - len(self._queue)
+
+    @property
+    def paused_for(self) -> float:
+        """Seconds until the bucket resumes handing out tokens (0 if not paused)."""
+        return max(0.0, self._paused_until - time.monotonic())
+
+    def stats(self) -> dict[Priority, LaneStats]:
+        """Per-lane queue depth and token wait times since startup."""
+        return {
+            priority: LaneStats(
+                queued=lane.queued,
+                served=lane.served,
+                average_wait=lane.total_wait / lane.served if lane.served else 0.0,
+                max_wait=lane.max_wait,
+            )
+            for priority, lane in self._lanes.items()
+        }
+
+
+def parse_retry_after(value: str | None, default: float) -> float:
+    """Seconds to wait from a Retry-After header; ``default`` if absent or not numeric."""
+    try:
+        return max(0.0, float(value)) if value is not None else default
+    except ValueError:
+        return default
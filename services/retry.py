@@ -0,0 +1,59 @@
+"""Retry and hedging policy for idempotent upstream GETs.
+
+Timeouts, connection errors and 502/503/504 are usually transient: one more
+try a moment later tends to succeed. Retries wait with full-jitter
+exponential backoff so a burst of failed requests doesn't retry in lockstep,
+and every retry (or hedged duplicate) spends a token from a ``RetryBudget``
+that only refills as first attempts go out, so an outage can't turn every
+request into three.
+"""
+
+import bisect
+import random
+from collections import deque
+
+RETRYABLE_STATUSES = frozenset({502, 503, 504})
+
+
+def backoff_delay(retry: int, base: float, cap: float) -> float:
+    """Seconds to wait before retry number ``retry`` (0-based): uniform in [0, min(cap, base * 2**retry)]."""
+    return random.uniform(0, min(cap, base * 2 ** retry))
+
+
+class RetryBudget:
+    """Allows retries worth ``ratio`` of recent requests, plus a small ``reserve`` for quiet periods."""
+
+    def __init__(self, ratio: float = 0.1, reserve: float = 10.0):
+        self.ratio = ratio
+        self.reserve = reserve
+        self._tokens = reserve
+
+    def record_request(self) -> None:
+        self._tokens = min(self.reserve, self._tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+
+class LatencyTracker:
+    """Sliding window of recent response times, for the hedging threshold."""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.min_samples = min_samples
+        self._recent: deque[float] = deque(maxlen=window)
+        self._sorted: list[float] = []
+
+    def observe(self, seconds: float) -> None:
+        if len(self._recent) == self._recent.maxlen:
+            del self._sorted[bisect.bisect_left(self._sorted, self._recent[0])]
+        self._recent.append(seconds)
+        bisect.insort(self._sorted, seconds)
+
+    def percentile(self, fraction: float) -> float | None:
+        """The ``fraction`` quantile of the window, or None until ``min_samples`` were seen."""
+        if len(self._sorted) < self.min_samples:
+            return None
+        return self._sorted[min(len(self._sorted) - 1, int(fraction * len(self._sorted)))]
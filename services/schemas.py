@@ -0,0 +1,132 @@
+"""Typed shapes of the Clash Royale API responses the client decodes directly.
+
+Only the fields the bot reads are declared: msgspec skips everything else
+while parsing, so these never build the full dict tree (clan badges, arena
+info, every clan's trophies in the race log...) and the cached objects stay
+small. Attribute names are snake_case; the API's camelCase keys are mapped
+automatically.
+"""
+
+import msgspec
+
+
+class Schema(msgspec.Struct, frozen=True, rename="camel", gc=False):
+    """Base for API response shapes: immutable, slot-based and untracked by the GC."""
+
+
+class ClanMemberItem(Schema):
+    tag: str
+    name: str = "Unknown"
+    role: str = "member"  # member | elder | coLeader | leader
+
+
+class Clan(Schema):
+    """/clans/{tag}: name, member count and the whole member list."""
+
+    tag: str = ""
+    name: str = ""
+    members: int | None = None
+    member_list: list[ClanMemberItem] = []
+
+
+class RaceParticipant(Schema):
+    tag: str
+    name: str = "Unknown"
+    fame: int = 0
+    decks_used: int = 0
+    decks_used_today: int = 0
+    boat_attacks: int = 0
+
+
+class RaceClan(Schema):
+    tag: str = ""  # only sent in race log standings
+    participants: list[RaceParticipant] = []
+
+
+class RiverRace(Schema):
+    """/currentriverrace: the race in progress for the requested clan."""
+
+    period_type: str = ""  # "training" | "warDay" | "colosseum"
+    clan: RaceClan = RaceClan()
+
+
+class RaceStanding(Schema):
+    clan: RaceClan = RaceClan()
+
+
+class RaceLogItem(Schema):
+    season_id: int = 0
+    section_index: int = 0
+    standings: list[RaceStanding] = []
+
+
+class RaceLog(Schema):
+    items: list[RaceLogItem] = []
+
+
+class TournamentMember(Schema):
+    name: str
+    score: int = 0
+    rank: int = 0
+
+
+class Tournament(Schema):
+    name: str = "Unknown Tournament"
+    members_list: list[TournamentMember] = []
+
+
+class PlayerClan(Schema):
+    tag: str
+    name: str = "No Clan"
+
+
+class PathOfLegendResult(Schema):
+    league_number: int | None = None
+    trophies: int = 0
+    rank: int | None = None
+
+
+class PlayerCard(Schema):
+    level: int = 0
+    max_level: int = 0
+    evolution_level: int = 0
+
+
+class PlayerBadge(Schema):
+    name: str
+    progress: int = 0
+
+
+class Player(Schema):
+    """/players/{tag}: only decoded on the way to a ``PlayerSummary``, never cached."""
+
+    name: str = "Unknown"
+    exp_level: int = 0
+    trophies: int = 0
+    best_trophies: int = 0
+    role: str = ""
+    clan: PlayerClan | None = None
+    current_path_of_legend_season_result: PathOfLegendResult | None = None
+    best_path_of_legend_season_result: PathOfLegendResult | None = None
+    cards: list[PlayerCard] = []
+    badges: list[PlayerBadge] = []
+
+
+class PlayerSummary(Schema):
+    """What the bot shows about a player, with card-level counts precomputed."""
+
+    name: str
+    exp_level: int
+    trophies: int
+    best_trophies: int
+    role: str  # member | elder | coLeader | leader, "" if clanless
+    clan: PlayerClan | None
+    ranked_current: PathOfLegendResult | None
+    ranked_best: PathOfLegendResult | None
+    clan_war_wins: int  # badge progress
+    classic_challenge_wins: int
+    grand_challenge_wins: int
+    evolutions: int  # cards at evolution level 1
+    max_level_cards: int
+    max_minus_1_cards: int
+    max_minus_2_cards: int
@@ -13,7 +13,7 @@ import numpy as np
 from services.clash_royale import ClanMember, WarHistory
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class MemberScore:
     tag: str
     name: str
@@ -31,31 +31,45 @@ def _slope_score(slope: float) -> float:
     return 10 - 10 * (1 - 1 / (1 + math.log(1 - slope / 3600, 1.03)))
 
 
-def score_member(member: ClanMember, history: WarHistory) -> MemberScore:
-    weeks = history.weeks_in_clan(member.tag)
-    if weeks == 0:
-        return MemberScore(tag=member.tag, name=member.name, total=None, fame_score=0, slope_score=0, weeks=0)
+def _trend_slopes(fame: np.ndarray, weeks: np.ndarray) -> np.ndarray:
+    """Least-squares slope of fame against time over each member's streak, one row per member.
 
-    fame_by_war = history.fame_history(member.tag, weeks)
-    fame_score = sum(fame_by_war) / weeks
-
-    if len(fame_by_war) > 1:
-        x = range(1, weeks + 1)  # wars ago
-        slope = -1 * np.polyfit(x, fame_by_war, 1)[0]
-    else:
-        slope = 0
-
-    slope_score = _slope_score(slope)
-    total = fame_score + slope_score + weeks
-    return MemberScore(
-        tag=member.tag,
-        name=member.name,
-        total=total,
-        fame_score=fame_score,
-        slope_score=slope_score,
-        weeks=weeks,
-    )
+    Columns of ``fame`` are wars 1, 2, ... ago; only the first ``weeks`` of a
+    row are fitted. Positive = fame rising toward the present. Members with
+    fewer than two wars get 0.
+    """
+    x = np.arange(1, fame.shape[1] + 1)  # wars ago
+    in_streak = x <= weeks[:, None]
+    y = np.where(in_streak, fame, 0).astype(float)
+    n = weeks.astype(float)
+    sum_x = n * (n + 1) / 2
+    sum_xx = n * (n + 1) * (2 * n + 1) / 6
+    numerator = n * (y * x).sum(axis=1) - sum_x * y.sum(axis=1)
+    denominator = n * sum_xx - sum_x ** 2
+    slopes = np.divide(numerator, denominator, out=np.zeros(len(n)), where=weeks > 1)
+    return -slopes  # x counts backwards in time
 
 
 def score_members(members: list[ClanMember], history: WarHistory) -> list[MemberScore]:
-    return [score_member(member, history) for member in members]
+    tags = [member.tag for member in members]
+    weeks = history.weeks_in_clan_of(tags)
+    fame_scores = history.average_fame_of(tags)
+    slopes = _trend_slopes(history.fame_matrix(tags, len(history)), weeks)
+
+    scores = []
+    for member, member_weeks, fame_score, slope in zip(members, weeks.tolist(), fame_scores.tolist(),
+                                                       slopes.tolist(), strict=True):
+        if member_weeks == 0:
+            scores.append(MemberScore(tag=member.tag, name=member.name, total=None, fame_score=0, slope_score=0,
+                                      weeks=0))
+            continue
+        slope_score = _slope_score(slope)
+        scores.append(MemberScore(
+            tag=member.tag,
+            name=member.name,
+            total=fame_score + slope_score + member_weeks,
+            fame_score=fame_score,
+            slope_score=slope_score,
+            weeks=member_weeks,
+        ))
+    return scores
@@ -0,0 +1,39 @@
+"""Short-lived memo of clan-tag resolution for ``resolve_clan_tag``.
+
+Nearly every clan command starts by turning the user's input into a
+validated tag: a ``clan_links`` query for nicknames, then a clan lookup just
+to prove the tag exists. Both answers rarely change, so they are remembered
+for ``ttl`` seconds: nickname -> tag per guild (including "no such
+nickname"), and the set of tags known to exist. ``/nicklink`` edits drop
+the guild's nicknames at once.
+"""
+
+from cachetools import TTLCache
+
+
+class TagMemo:
+    def __init__(self, ttl: float, max_entries: int = 4096):
+        self._nicknames: TTLCache[tuple[int, str], str | None] = TTLCache(max_entries, ttl)
+        self._existing: TTLCache[str, bool] = TTLCache(max_entries, ttl)
+
+    @staticmethod
+    def _nickname_key(guild_id: int, nickname: str) -> tuple[int, str]:
+        return int(guild_id), nickname.strip().lower()  # clan_links compares nicknames case-insensitively
+
+    def nickname(self, guild_id: int, nickname: str) -> str | None:
+        """The remembered tag (None: no such nickname). Raises KeyError if nothing is remembered."""
+        return self._nicknames[self._nickname_key(guild_id, nickname)]
+
+    def remember_nickname(self, guild_id: int, nickname: str, clan_tag: str | None) -> None:
+        self._nicknames[self._nickname_key(guild_id, nickname)] = clan_tag
+
+    def forget_guild(self, guild_id: int) -> None:
+        """Drop every remembered nickname of a guild, e.g. after ``/nicklink`` changed one."""
+        for key in [key for key in self._nicknames if key[0] == int(guild_id)]:
+            self._nicknames.pop(key, None)
+
+    def is_known_clan(self, clan_tag: str) -> bool:
+        return clan_tag in self._existing
+
+    def remember_clan(self, clan_tag: str) -> None:
+        self._existing[clan_tag] = True
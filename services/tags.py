@@ -0,0 +1,33 @@
+"""Canonical Clash Royale tags.
+
+A ``Tag`` is a plain ``str`` in normalized form (no '#', uppercase, O/0 typo
+fixed), produced once where a tag enters the bot — user input, API payloads,
+database rows — and passed around as-is afterwards. Normalized tags are
+interned, so the same tag is the same object everywhere: dict lookups keyed
+by tags hash and compare by identity, and normalizing a tag seen before is a
+cache hit instead of four new strings.
+"""
+
+import sys
+from functools import lru_cache
+from typing import NewType
+
+Tag = NewType("Tag", str)
+
+TAG_ALPHABET = frozenset("0289PYLQGRJCUV")  # the only characters Supercell tags are made of
+
+
+@lru_cache(maxsize=8192)
+def normalize_tag(tag: str) -> Tag:
+    """Canonical tag form: no '#', uppercase, common O/0 typo fixed; interned."""
+    return Tag(sys.intern(tag.strip().lstrip("#").upper().replace("O", "0")))
+
+
+def is_valid_tag(tag: str) -> bool:
+    """Whether a normalized tag could exist at all, i.e. is worth asking the API about."""
+    return bool(tag) and TAG_ALPHABET.issuperset(tag)
+
+
+def intern_tag(tag: str) -> Tag:
+    """A tag that is already canonical (e.g. read back from the database), interned as-is."""
+    return Tag(sys.intern(tag))
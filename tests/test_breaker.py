@@ -0,0 +1,19 @@
+from services.breaker import BreakerState, CircuitBreaker
+
+
+def test_circuit_breaker_failed_probe_reopens_and_4xx_counts_as_success():
+    breaker = CircuitBreaker(failure_threshold=2, cooldown=0)
+    breaker.record_failure()
+    breaker.record_success()  # e.g. a 404: upstream answered
+    breaker.record_failure()
+    assert breaker.state is BreakerState.CLOSED
+
+    breaker.record_failure()
+    assert breaker.state is BreakerState.HALF_OPEN  # zero cooldown
+    assert breaker.claim_probe()
+    assert breaker.is_open  # the probe is out; everyone else still fails fast
+    breaker.record_failure()
+    assert breaker.status().consecutive_failures == 3
+    assert breaker.claim_probe()
+    breaker.abandon_probe()
+    assert not breaker.is_open
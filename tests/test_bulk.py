@@ -0,0 +1,26 @@
+import asyncio
+
+from errors import ClanNotFound
+from services import bulk
+
+
+async def test_map_concurrent_bounds_concurrency():
+    running = peak = 0
+
+    async def work(item: int) -> int:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        if item == 3:
+            raise ClanNotFound()
+        return item * 2
+
+    results = await bulk.map_concurrent(work, range(10), limit=3)
+    assert peak == 3
+    assert [r.value for r in results if r.ok] == [0, 2, 4, 8, 10, 12, 14, 16, 18]
+    assert isinstance(results[3].error, ClanNotFound)
+
+    finished = [r.item async for r in bulk.as_completed(work, [2, 1, 0], limit=3)]
+    assert sorted(finished) == [0, 1, 2]
@@ -0,0 +1,50 @@
+import time
+from datetime import UTC, datetime
+
+from services.cache import CachedResponse, MemoryCache, endpoint_family
+
+
+def cached(size: int, fresh_for: float = 60) -> CachedResponse:
+    return CachedResponse({}, datetime.now(UTC), time.monotonic() + fresh_for, size)
+
+
+def test_memory_cache_stays_within_byte_budget():
+    cache = MemoryCache(max_bytes=1000)
+    cache[("/clans/%23A/riverracelog", (), None)] = cached(600)
+    for i in range(5):
+        cache[(f"/clans/%23S{i}", (), None)] = cached(50)
+    cache[("/players/%23P", (), None)] = cached(300)
+
+    assert cache.total_bytes <= 1000
+    # The big race log was the largest of the least recently used entries.
+    assert cache.get(("/clans/%23A/riverracelog", (), None)) is None
+    assert cache.get(("/clans/%23S0", (), None)) is not None
+
+
+def test_memory_cache_evicts_expired_first_and_skips_oversized():
+    cache = MemoryCache(max_bytes=100)
+    cache[("/clans/%23OLD", (), None)] = cached(10, fresh_for=-1)
+    cache[("/clans/%23BIG", (), None)] = cached(60)
+    cache[("/clans/%23NEW", (), None)] = cached(40)
+    assert len(cache) == 2
+    assert cache.get(("/clans/%23BIG", (), None)) is not None
+
+    cache[("/clans/%23HUGE", (), None)] = cached(500)
+    assert cache.get(("/clans/%23HUGE", (), None)) is None
+    assert cache.total_bytes == 100
+
+
+def test_memory_cache_stats_per_endpoint_family():
+    cache = MemoryCache(max_bytes=10_000)
+    cache[("/clans/%23A", (), None)] = cached(100)
+    cache[("/clans/%23B", (), None)] = cached(100)
+    cache.record_lookup(("/clans/%23A", (), None), hit=True)
+    cache.record_lookup(("/clans/%23C", (), None), hit=False)
+    cache.record_lookup(("/clans/%23A/riverracelog", (), None), hit=False)
+
+    stats = cache.stats()
+    assert endpoint_family("/clans/%23ABC/riverracelog") == "/clans/{tag}/riverracelog"
+    assert stats["/clans/{tag}"].entries == 2
+    assert stats["/clans/{tag}"].bytes == 200
+    assert stats["/clans/{tag}"].hit_ratio == 0.5
+    assert stats["/clans/{tag}/riverracelog"].misses == 1
@@ -0,0 +1,11 @@
+from services.deadline import deadline, time_left
+
+
+def test_nested_deadlines_only_shorten():
+    assert time_left() is None
+    with deadline(10):
+        with deadline(60):
+            assert time_left() <= 10
+        with deadline(1):
+            assert time_left() <= 1
+    assert time_left() is None
@@ -1,24 +1,56 @@
+import asyncio
+import dataclasses
+import time
+from datetime import UTC, datetime
+
 import aiohttp
 import pytest
 from aiohttp import web
 from aiohttp.test_utils import TestServer
 
-from errors import APIUnavailable, ClanNotFound, PlayerNotFound, RateLimited
-from services.clash_royale import ClashRoyaleClient
+from db.response_cache import ResponseCache, StoredResponse
+from errors import APIDown, APIUnavailable, ClanNotFound, DeadlineExceeded, PlayerNotFound, RateLimited
+from services.breaker import BreakerState
+from services.cache import PROJECTION_SIZE, CachedResponse
+from services.clash_royale import ClashRoyaleClient, members_of, next_war_end, race_log_ttl
+from services.deadline import deadline
+from services.http import accept_stale, ttl_from_headers
+from services.ratelimit import Priority, request_priority
+from services.retry import RetryBudget
+from services.schemas import Clan
 
 
 @pytest.fixture
 async def api():
-    """Local fake Clash Royale API. Tests register responses keyed by raw path."""
+    """Local fake Clash Royale API. Tests register responses keyed by raw path.
+
+    A response is (status, payload) or (status, payload, headers); a list of
+    them is served in order, one per request. ``delays`` holds seconds to
+    stall before answering a path (a list is used up one per request).
+    """
     app = web.Application()
     app["responses"] = {}
     app["hits"] = {}
+    app["keys_seen"] = []
+    app["rejected_keys"] = set()
+    app["delays"] = {}
 
     async def handler(request: web.Request):
         path = request.rel_url.raw_path
         app["hits"][path] = app["hits"].get(path, 0) + 1
-        status, payload = app["responses"].get(path, (404, {}))
-        return web.json_response(payload, status=status)
+        delay = app["delays"].get(path, 0)
+        if isinstance(delay, list):
+            delay = delay.pop(0) if len(delay) > 1 else delay[0]
+        await asyncio.sleep(delay)
+        key = request.headers["Authorization"].removeprefix("Bearer ")
+        app["keys_seen"].append(key)
+        if key in app["rejected_keys"]:
+            return web.json_response({"reason": "accessDenied"}, status=403)
+        response = app["responses"].get(path, (404, {}))
+        if isinstance(response, list):
+            response = response.pop(0) if len(response) > 1 else response[0]
+        status, payload, headers = (*response, {}) if len(response) == 2 else response
+        return web.json_response(payload, status=status, headers=headers)
 
     app.router.add_get("/{tail:.*}", handler)
     server = TestServer(app)
@@ -26,6 +58,8 @@ async def api():
 
     async with aiohttp.ClientSession() as session:
         client = ClashRoyaleClient(session, "key", base_url=str(server.make_url("")))
+        client._retry_base_delay = 0.01
+        app["session"] = session
         yield app, client
 
     await server.close()
@@ -36,13 +70,24 @@ async def test_clan_success_and_cache(api):
     app["responses"]["/clans/%23ABC123"] = (200, {"name": "MyClan", "tag": "#ABC123"})
 
     clan = await client.clan("#abc123")
-    assert clan["name"] == "MyClan"
+    assert clan.name == "MyClan"
 
     # Same normalized tag => served from cache, no second request.
     await client.clan("ABC123")
     assert app["hits"]["/clans/%23ABC123"] == 1
 
 
+async def test_raw_and_typed_reads_of_one_path_are_cached_apart(api):
+    app, client = api
+    app["responses"]["/clans/%23P2YL9Q"] = (200, {"name": "Mixed", "tag": "#P2YL9Q"})
+
+    raw, clan = await asyncio.gather(client.get_json("/clans/%23P2YL9Q"), client.clan("P2YL9Q"))
+    assert raw["name"] == "Mixed" and isinstance(clan, Clan)  # not coalesced into one type
+    assert isinstance(await client.clan("P2YL9Q"), Clan)
+    assert isinstance(await client.get_json("/clans/%23P2YL9Q"), dict)
+    assert app["hits"]["/clans/%23P2YL9Q"] == 2  # one per schema, then both cached
+
+
 async def test_status_codes_become_typed_errors(api):
     app, client = api
     with pytest.raises(ClanNotFound):
@@ -51,7 +96,7 @@ async def test_status_codes_become_typed_errors(api):
     with pytest.raises(PlayerNotFound):
         await client.player("MISSING")
 
-    app["responses"]["/clans/%23LIMITED"] = (429, {})
+    app["responses"]["/clans/%23LIMITED"] = (429, {}, {"Retry-After": "0"})
     with pytest.raises(RateLimited):
         await client.clan("LIMITED")
 
@@ -69,9 +114,9 @@ async def test_river_race_log_sorted_newest_first(api):
     app, client = api
     items = [
         {"seasonId": 9, "sectionIndex": 3,
-         "standings": [{"clan": {"participants": [{"tag": "#AAA", "fame": 111}]}}]},
+         "standings": [{"clan": {"tag": "#WARL0G", "participants": [{"tag": "#AAA", "fame": 111}]}}]},
         {"seasonId": 10, "sectionIndex": 0,
-         "standings": [{"clan": {"participants": [{"tag": "#AAA", "fame": 999}]}}]},
+         "standings": [{"clan": {"tag": "#WARL0G", "participants": [{"tag": "#AAA", "fame": 999}]}}]},
     ]
     app["responses"]["/clans/%23WARL0G/riverracelog"] = (200, {"items": items})
 
@@ -79,15 +124,520 @@ async def test_river_race_log_sorted_newest_first(api):
     assert len(history) == 2
     assert history.fame("AAA", 1) == 999  # newest war first regardless of API order
     assert history.fame("AAA", 2) == 111
+    assert await client.river_race_log("WARL0G") is history  # same cached log, same (read-only) history
+    cached = client.cache_stats()["/clans/{tag}/riverracelog"]
+    assert cached.entries == 1 and cached.bytes > history.nbytes > 0  # the history is counted, not held on the side
 
 
-async def test_clan_members_parsed_and_normalized(api):
+async def test_clan_members_come_from_the_clan_payload(api):
     app, client = api
-    app["responses"]["/clans/%23CLAN01/members"] = (200, {"items": [
-        {"tag": "#p1", "name": "Alice", "role": "leader"},
+    app["responses"]["/clans/%23CLAN01"] = (200, {"name": "Clan", "members": 2, "badgeId": 1, "memberList": [
+        {"tag": "#p1", "name": "Alice", "role": "leader", "trophies": 9000},
         {"tag": "#P2", "name": "Bob", "role": "member"},
     ]})
 
+    clan = await client.clan("clan01")
+    assert isinstance(clan, Clan) and clan.members == 2  # typed, unread fields skipped
     members = await client.clan_members("clan01")
     assert [m.tag for m in members] == ["P1", "P2"]
     assert members[0].role == "leader"
+    assert members_of(clan) == members
+    assert app["hits"] == {"/clans/%23CLAN01": 1}  # one request for metadata and members
+
+
+async def test_concurrent_requests_are_coalesced(api):
+    app, client = api
+    app["responses"]["/clans/%23BUSY1"] = (200, {"name": "Busy"})
+
+    results = await asyncio.gather(*(client.clan("BUSY1") for _ in range(5)))
+    assert all(r.name == "Busy" for r in results)
+    assert app["hits"]["/clans/%23BUSY1"] == 1
+
+
+async def test_coalesced_errors_reach_every_waiter_and_are_not_cached(api):
+    app, client = api
+    app["responses"]["/clans/%23DEAD1"] = (500, {})
+    results = await asyncio.gather(*(client.clan("DEAD1") for _ in range(3)), return_exceptions=True)
+    assert all(isinstance(r, APIUnavailable) for r in results)
+    assert app["hits"]["/clans/%23DEAD1"] == 1
+
+    with pytest.raises(APIUnavailable):
+        await client.clan("DEAD1")
+    assert app["hits"]["/clans/%23DEAD1"] == 2
+
+
+async def test_rate_limited_request_is_retried_after_retry_after(api):
+    app, client = api
+    app["responses"]["/clans/%23BURST1"] = [(429, {}, {"Retry-After": "0.05"}), (200, {"name": "Burst"})]
+
+    clan = await client.clan("BURST1")
+    assert clan.name == "Burst"
+    assert app["hits"]["/clans/%23BURST1"] == 2
+
+
+async def test_long_retry_after_fails_fast_and_pauses_bucket(api):
+    app, client = api
+    app["responses"]["/clans/%23WAIT1"] = (429, {}, {"Retry-After": "60"})
+
+    with pytest.raises(RateLimited):
+        await client.clan("WAIT1")
+    assert app["hits"]["/clans/%23WAIT1"] == 1
+    assert client.key_usage()[0].benched_for > 50
+
+
+async def test_joining_a_background_request_raises_its_lane(api):
+    app, client = api
+    for tag in ("P0LL1", "P0LL2", "P0LL3", "SHARED"):
+        app["responses"][f"/clans/%23{tag}"] = (200, {"name": tag})
+    bucket = client._keys.choose().bucket
+    for _ in range(int(bucket.capacity)):
+        await bucket.acquire()  # drain the burst so every request below queues
+    finished = []
+
+    async def fetch(tag, priority):
+        with request_priority(priority):
+            await client.clan(tag)
+        finished.append((tag, priority))
+
+    polls = [asyncio.create_task(fetch(tag, Priority.BACKGROUND)) for tag in ("P0LL1", "P0LL2", "P0LL3", "SHARED")]
+    await asyncio.sleep(0)  # all four are queued in the background lane
+    await fetch("SHARED", Priority.INTERACTIVE)
+    await asyncio.gather(*polls)
+
+    assert [tag for tag, _ in finished[:2]] == ["SHARED", "SHARED"]  # ahead of the other polls
+    assert app["hits"]["/clans/%23SHARED"] == 1
+    assert client.lane_stats()[Priority.INTERACTIVE].served == int(bucket.capacity) + 1  # drain + the raised request
+
+
+async def test_key_pool_spreads_requests_across_keys(api):
+    app, client = api
+    pool = ClashRoyaleClient(app["session"], ["key-a", "key-b"], base_url=client._base_url, requests_per_second=1)
+    for i in range(4):
+        app["responses"][f"/clans/%23SPREAD{i}"] = (200, {"name": "Spread"})
+
+    await asyncio.gather(*(pool.clan(f"SPREAD{i}") for i in range(4)))
+    assert sorted(app["keys_seen"]) == ["key-a", "key-a", "key-b", "key-b"]
+    assert [usage.requests for usage in pool.key_usage()] == [2, 2]
+
+
+async def test_rejected_key_is_benched_and_request_retried(api):
+    app, client = api
+    pool = ClashRoyaleClient(app["session"], ["key-a", "key-b"], base_url=client._base_url)
+    app["rejected_keys"].add("key-a")
+    app["responses"]["/clans/%23PAIR1"] = (200, {"name": "Pool"})
+    app["responses"]["/clans/%23PAIR2"] = (200, {"name": "Pool"})
+
+    assert (await pool.clan("PAIR1")).name == "Pool"
+    assert (await pool.clan("PAIR2")).name == "Pool"
+
+    usage = {u.label: u for u in pool.key_usage()}
+    assert usage["…ey-a"].rejections == 1
+    assert usage["…ey-a"].benched_for > 0
+    assert app["keys_seen"].count("key-a") == 1  # benched after its first 403
+
+
+async def test_single_rejected_key_fails_fast(api):
+    app, client = api
+    app["rejected_keys"].add("key")
+    with pytest.raises(APIUnavailable):
+        await client.clan("ANY1")
+    assert client.key_usage()[0].benched_for == 0
+
+
+def test_next_war_end_is_monday_reset():
+    thursday = datetime(2026, 10, 15, 18, 0, tzinfo=UTC)
+    assert next_war_end(thursday) == datetime(2026, 10, 19, 10, 0, tzinfo=UTC)
+    # Monday before the reset: this week's war hasn't ended yet.
+    assert next_war_end(datetime(2026, 10, 19, 9, 59, tzinfo=UTC)) == datetime(2026, 10, 19, 10, 0, tzinfo=UTC)
+    # Exactly at the reset it rolls to the following week.
+    assert next_war_end(datetime(2026, 10, 19, 10, 0, tzinfo=UTC)) == datetime(2026, 10, 26, 10, 0, tzinfo=UTC)
+
+
+def test_race_log_ttl_lasts_until_war_end():
+    thursday = datetime(2026, 10, 15, 10, 0, tzinfo=UTC)
+    assert race_log_ttl(thursday) == 4 * 24 * 3600
+    # Just after a war ends the new log may not be published yet: cache briefly.
+    assert race_log_ttl(datetime(2026, 10, 19, 10, 5, tzinfo=UTC)) == 300
+
+
+async def test_cache_ttl_per_endpoint(api):
+    _, client = api
+    assert client.cache_ttl("/clans/%23ABC/currentriverrace") == 30
+    assert client.cache_ttl("/clans/%23ABC") == 180
+    assert client.cache_ttl("/clans/%23ABC/riverracelog") >= 300  # until the next war ends
+    assert client.cache_ttl("/tournaments/%23ABC") == 60  # client default
+
+    # Headers override fixed rules, but not the war calendar unless they allow longer.
+    headers = {"Cache-Control": "public max-age=600"}
+    assert client.cache_ttl("/clans/%23ABC", headers) == 600
+    calendar = client.cache_ttl("/clans/%23ABC/riverracelog")
+    assert client.cache_ttl("/clans/%23ABC/riverracelog", headers) == pytest.approx(max(calendar, 600), abs=1)
+    assert client.cache_ttl("/clans/%23ABC/riverracelog", {"Cache-Control": "max-age=20"}) == pytest.approx(
+        calendar, abs=1
+    )
+
+
+def expire_cache(client):
+    """Mark every cached response stale (still inside the stale grace window)."""
+    for key, entry in list(client._cache.items()):
+        client._cache[key] = dataclasses.replace(entry, fresh_until=time.monotonic() - 1)
+
+
+async def test_stale_while_revalidate_serves_stale_then_refreshes(api):
+    app, client = api
+    app["responses"]["/clans/%23STALE1"] = (200, {"name": "Before"})
+    await client.clan("STALE1")
+    expire_cache(client)
+    app["responses"]["/clans/%23STALE1"] = (200, {"name": "After"})
+
+    with accept_stale() as freshness:
+        clan = await client.clan("STALE1")
+    assert clan.name == "Before"
+    assert freshness.as_of is not None
+
+    await asyncio.sleep(0.1)  # let the background refresh land
+    assert app["hits"]["/clans/%23STALE1"] == 2
+    with accept_stale() as freshness:
+        assert (await client.clan("STALE1")).name == "After"
+    assert freshness.as_of is None
+
+
+async def test_stale_entries_not_served_without_opt_in(api):
+    app, client = api
+    app["responses"]["/clans/%23STALE2"] = (200, {"name": "Before"})
+    await client.clan("STALE2")
+    expire_cache(client)
+    app["responses"]["/clans/%23STALE2"] = (200, {"name": "After"})
+
+    assert (await client.clan("STALE2")).name == "After"
+
+
+async def test_stale_entries_refetched_count_as_misses(api):
+    app, client = api
+    app["responses"]["/clans/%23STALE4"] = (200, {"name": "Clan"})
+    await client.clan("STALE4")
+    for _ in range(3):
+        expire_cache(client)
+        await client.clan("STALE4")  # within the grace window, but not usable without accept_stale()
+
+    stats = client.cache_stats()["/clans/{tag}"]
+    assert app["hits"]["/clans/%23STALE4"] == 4
+    assert (stats.hits, stats.misses) == (0, 4)
+
+    await client.clan("STALE4")
+    assert client.cache_stats()["/clans/{tag}"].hits == 1
+
+
+async def test_stale_value_kept_while_upstream_fails(api):
+    app, client = api
+    app["responses"]["/clans/%23STALE3"] = (200, {"name": "Before"})
+    await client.clan("STALE3")
+    expire_cache(client)
+    app["responses"]["/clans/%23STALE3"] = (503, {})
+
+    for _ in range(2):
+        with accept_stale() as freshness:
+            assert (await client.clan("STALE3")).name == "Before"
+        assert freshness.as_of is not None
+        await asyncio.sleep(0.05)
+
+
+async def test_disk_cache_survives_restart(api, tmp_path):
+    app, client = api
+    app["responses"]["/clans/%23WARM1"] = (200, {"name": "Warm"})
+
+    cache = ResponseCache(str(tmp_path / "cache.db"), max_bytes=1024 * 1024)
+    await cache.connect()
+    first = ClashRoyaleClient(app["session"], "key", base_url=client._base_url, disk_cache=cache)
+    await first.clan("WARM1")
+    await asyncio.gather(*first._disk_writes)
+    await cache.close()
+
+    # A new process: empty memory cache, same file on disk.
+    cache = ResponseCache(str(tmp_path / "cache.db"), max_bytes=1024 * 1024)
+    await cache.connect()
+    second = ClashRoyaleClient(app["session"], "key", base_url=client._base_url, disk_cache=cache)
+    assert (await second.clan("WARM1")).name == "Warm"
+    assert (await second.get_json("/clans/%23WARM1"))["name"] == "Warm"  # one raw body on disk, any schema
+    assert app["hits"]["/clans/%23WARM1"] == 1
+    await cache.close()
+
+
+async def test_undecodable_disk_entry_is_dropped_and_refetched(api, tmp_path):
+    app, client = api
+    app["responses"]["/clans/%23P2YL9Q"] = (200, {"name": "Now"})
+    cache = ResponseCache(str(tmp_path / "cache.db"), max_bytes=1024 * 1024)
+    await cache.connect()
+    disk_client = ClashRoyaleClient(app["session"], "key", base_url=client._base_url, disk_cache=cache)
+    key = f"{client._base_url}/clans/%23P2YL9Q?"
+    await cache.put(key, b'{"name": ["written", "by", "an", "older", "schema"]}', time.time(), time.time() + 60)
+
+    assert (await disk_client.clan("P2YL9Q")).name == "Now"  # a miss, not a DecodeError
+    assert app["hits"]["/clans/%23P2YL9Q"] == 1
+    await disk_client.aclose()
+    assert (await cache.get(key)).body == b'{"name": "Now"}'
+    await cache.close()
+
+
+async def test_disk_read_does_not_overwrite_a_newer_fetch(api):
+    _, client = api
+    cache_key = ("/clans/%23P2YL9Q", (), Clan)
+    newer = CachedResponse(Clan(name="Newer"), datetime.now(UTC), time.monotonic() + 60)
+
+    class SlowDisk:
+        async def get(self, key: str) -> StoredResponse:
+            client._cache[cache_key] = newer  # a concurrent fetch lands while the disk is read
+            return StoredResponse(b'{"name": "Older"}', time.time() - 30, time.time() + 30)
+
+    client._disk_cache = SlowDisk()
+    assert (await client.clan("P2YL9Q")).name == "Newer"
+    assert client._cache.get(cache_key) is newer
+
+
+def test_ttl_from_headers():
+    assert ttl_from_headers({"Cache-Control": "public, max-age=120"}) == 120
+    assert ttl_from_headers({"Cache-Control": "public max-age=600"}) == 600  # what the Clash Royale API sends
+    assert ttl_from_headers({"Cache-Control": "max-age=120, s-maxage=30"}) == 30
+    assert ttl_from_headers({"Cache-Control": "max-age=120", "Age": "100"}) == 20
+    assert ttl_from_headers({"Cache-Control": "no-store"}) == 0
+    assert ttl_from_headers({
+        "Date": "Sun, 18 Oct 2026 10:00:00 GMT",
+        "Expires": "Sun, 18 Oct 2026 10:05:00 GMT",
+    }) == 300
+    assert ttl_from_headers({"Expires": "0"}) == 0
+    assert ttl_from_headers({}) is None
+
+
+async def test_cache_lifetime_follows_upstream_headers(api):
+    app, client = api
+    app["responses"]["/clans/%23HDR1"] = (200, {"name": "Short"}, {"Cache-Control": "max-age=15"})
+    app["responses"]["/clans/%23HDR2"] = (200, {"name": "Long"}, {"Cache-Control": "max-age=31536000"})
+    await client.clan("HDR1")
+    await client.clan("HDR2")
+
+    lifetimes = {key[0]: entry.fresh_until - time.monotonic() for key, entry in client._cache.items()}
+    assert 10 < lifetimes["/clans/%23HDR1"] <= 15
+    assert lifetimes["/clans/%23HDR2"] <= 24 * 3600  # clamped to the client's max
+
+
+async def test_circuit_breaker_fails_fast_then_probes(api):
+    app, client = api
+    client._breaker.cooldown = 0.05
+    app["responses"]["/clans/%23DEAD1"] = (503, {})
+    for _ in range(client._breaker.failure_threshold):
+        with pytest.raises(APIUnavailable):
+            await client.clan("DEAD1")
+    assert client.is_down
+    assert client.breaker_status().state is BreakerState.OPEN
+
+    # Open: refused locally, even for other paths.
+    app["responses"]["/clans/%23ABC"] = (200, {"name": "Up again"})
+    with pytest.raises(APIDown):
+        await client.clan("ABC")
+    assert "/clans/%23ABC" not in app["hits"]
+
+    # After the cooldown one probe goes out; its success closes the breaker.
+    await asyncio.sleep(0.06)
+    assert (await client.clan("ABC")).name == "Up again"
+    assert client.breaker_status().state is BreakerState.CLOSED
+
+
+async def test_deadline_cuts_slow_request_short(api):
+    app, client = api
+    app["responses"]["/clans/%23WAIT1"] = (200, {"name": "Slow"})
+    app["delays"]["/clans/%23WAIT1"] = 1.0
+
+    started = time.monotonic()
+    with deadline(0.1), pytest.raises(DeadlineExceeded):
+        await client.clan("WAIT1")
+    assert time.monotonic() - started < 0.5
+    assert client.breaker_status().consecutive_failures == 0  # our budget ran out, not the API
+
+    with deadline(0), pytest.raises(DeadlineExceeded):
+        await client.clan("WAIT1")  # no time left: not even sent
+    assert app["hits"]["/clans/%23WAIT1"] == 1
+
+
+async def test_transient_errors_are_retried_with_backoff(api):
+    app, client = api
+    app["responses"]["/clans/%23FLAKY2"] = [(503, {}), (502, {}), (200, {"name": "Recovered"})]
+    assert (await client.clan("FLAKY2")).name == "Recovered"
+    assert app["hits"]["/clans/%23FLAKY2"] == 3
+
+    app["responses"]["/clans/%23BAD1"] = (500, {})  # not a transient status
+    with pytest.raises(APIUnavailable):
+        await client.clan("BAD1")
+    assert app["hits"]["/clans/%23BAD1"] == 1
+
+
+async def test_retry_budget_caps_retries(api):
+    app, client = api
+    client._retry_budget = RetryBudget(ratio=0, reserve=1)
+    app["responses"]["/clans/%23FLAKY3"] = (503, {})
+    with pytest.raises(APIUnavailable):
+        await client.clan("FLAKY3")
+    assert app["hits"]["/clans/%23FLAKY3"] == 2  # one retry, then the budget is spent
+
+
+async def test_slow_request_is_hedged(api):
+    app, client = api
+    for _ in range(client._latency.min_samples):
+        client._latency.observe(0.01)
+    app["responses"]["/clans/%23HEDGE1"] = (200, {"name": "Fast"})
+    app["delays"]["/clans/%23HEDGE1"] = [1.0, 0]
+
+    started = time.monotonic()
+    assert (await client.clan("HEDGE1")).name == "Fast"
+    assert time.monotonic() - started < 0.5
+    assert app["hits"]["/clans/%23HEDGE1"] == 2
+
+
+async def test_queueing_on_the_rate_limiter_is_not_hedged(api):
+    app, client = api
+    for _ in range(client._latency.min_samples):
+        client._latency.observe(0.05)
+    tags = [f"Q{i}" for i in range(20)]
+    for tag in tags:
+        app["responses"][f"/clans/%23{tag}"] = (200, {"name": tag})
+    bucket = client._keys.choose().bucket
+    for _ in range(int(bucket.capacity)):
+        await bucket.acquire()  # saturated: each request below waits 0.1s per place in line for its token
+
+    await asyncio.gather(*(client.clan(tag) for tag in tags))
+    assert all(app["hits"][f"/clans/%23{tag}"] == 1 for tag in tags)
+    assert client._retry_budget.try_spend()  # the budget is still there for real retries
+
+
+async def test_get_many_returns_per_item_results_in_order(api):
+    app, client = api
+    app["responses"]["/clans/%23A1"] = (200, {"name": "First"})
+    app["responses"]["/clans/%23A3"] = (200, {"name": "Third"})
+    results = await client.get_many(["/clans/%23A1", "/clans/%23A2", "/clans/%23A3"])
+    assert [r.item for r in results] == ["/clans/%23A1", "/clans/%23A2", "/clans/%23A3"]
+    assert results[0].value["name"] == "First" and results[2].value["name"] == "Third"
+    assert not results[1].ok and results[1].value is None
+
+
+async def test_get_many_does_not_leak_dicts_to_typed_accessors(api):
+    app, client = api
+    app["responses"]["/clans/%23P2YL9Q"] = (200, {"name": "Bulk", "members": 3})
+    [result] = await client.get_many(["/clans/%23P2YL9Q"])
+    assert result.value["name"] == "Bulk"
+
+    clan = await client.clan("P2YL9Q")
+    assert isinstance(clan, Clan) and clan.name == "Bulk" and clan.members == 3
+
+
+async def test_clan_snapshot_fetches_parts_concurrently(api):
+    app, client = api
+    app["responses"]["/clans/%23SNAP1"] = (200, {"name": "Snap", "memberList": [
+        {"tag": "#AAA", "name": "Alice", "role": "leader"},
+    ]})
+    app["responses"]["/clans/%23SNAP1/currentriverrace"] = (200, {"periodType": "warDay", "clan": {"participants": [
+        {"tag": "#AAA", "name": "Alice", "fame": 900},
+        {"tag": "#BBB", "name": "Bob", "fame": 300},
+    ]}})
+    app["responses"]["/clans/%23SNAP1/riverracelog"] = (200, {"items": [
+        {"seasonId": 1, "sectionIndex": 0, "standings": [
+            {"clan": {"tag": "#SNAP1", "participants": [{"tag": "#AAA", "fame": 50}]}},
+        ]},
+    ]})
+    for path in list(app["responses"]):
+        app["delays"][path] = 0.1
+
+    started = time.monotonic()
+    snapshot = await client.clan_snapshot("#snap1")
+    assert time.monotonic() - started < 0.25  # about one round trip, not three
+
+    assert snapshot.name == "Snap"
+    assert [m.tag for m in snapshot.members] == ["AAA"]
+    assert snapshot.participants["AAA"].fame == 900
+    assert snapshot.former == {"BBB": "Bob"}
+    assert snapshot.history.fame("AAA", 1) == 50
+
+    partial_snapshot = await client.clan_snapshot("SNAP1", clan=False, war_log=False)
+    assert partial_snapshot.members == [] and len(partial_snapshot.history) == 0
+    assert partial_snapshot.participants["BBB"].name == "Bob"
+
+
+async def test_not_found_is_cached_separately(api):
+    app, client = api
+    for _ in range(3):
+        with pytest.raises(ClanNotFound):
+            await client.clan("TYP0")
+        assert not await client.clan_exists("TYP0")
+    assert app["hits"]["/clans/%23TYP0"] == 1
+    assert client.cache_stats()["/clans/{tag}"].entries == 0  # negative entries take no response-cache room
+
+    client._not_found.clear()  # expired
+    app["responses"]["/clans/%23TYP0"] = (200, {"name": "Created since"})
+    assert (await client.clan("TYP0")).name == "Created since"
+
+
+async def test_player_is_cached_as_a_slim_summary(api):
+    app, client = api
+    cards = [{"name": f"Card{i}", "level": 14 - i % 4, "maxLevel": 14, "evolutionLevel": int(i % 5 == 0),
+              "iconUrls": {"medium": "https://example.com/card.png"}} for i in range(100)]
+    app["responses"]["/players/%23PLAY1"] = (200, {
+        "tag": "#PLAY1", "name": "Alice", "expLevel": 60, "trophies": 9000, "bestTrophies": 9100,
+        "role": "coLeader", "clan": {"tag": "#CLAN1", "name": "Clan", "badgeId": 1},
+        "currentPathOfLegendSeasonResult": {"leagueNumber": 10, "trophies": 2100, "rank": 55},
+        "cards": cards,
+        "badges": [{"name": "ClanWarWins", "progress": 12}, {"name": "Grand12Wins", "progress": 3}],
+        "achievements": [{"name": f"A{i}", "info": "x" * 50} for i in range(30)],
+    })
+
+    player = await client.player("play1")
+    assert (player.name, player.role, player.clan.tag) == ("Alice", "coLeader", "#CLAN1")
+    assert player.ranked_current.rank == 55 and player.ranked_best is None
+    assert (player.clan_war_wins, player.classic_challenge_wins, player.grand_challenge_wins) == (12, 0, 3)
+    assert (player.max_level_cards, player.max_minus_1_cards, player.max_minus_2_cards) == (25, 25, 25)
+    assert player.evolutions == 20
+
+    assert await client.player("PLAY1") is player
+    assert client.cache_stats()["/players/{tag}"].bytes == PROJECTION_SIZE
+
+
+async def test_player_dossier_prefetches_the_hinted_clan(api):
+    app, client = api
+    app["responses"]["/players/%23PLAY2"] = (200, {"name": "Bob", "clan": {"tag": "#CLAN2", "name": "Clan"}})
+    app["responses"]["/clans/%23CLAN2/currentriverrace"] = (200, {"clan": {"participants": [
+        {"tag": "#PLAY2", "fame": 1200, "decksUsed": 8},
+    ]}})
+    app["responses"]["/clans/%23CLAN2/riverracelog"] = (200, {"items": [
+        {"seasonId": 1, "sectionIndex": 0, "standings": [{"clan": {"tag": "#CLAN2", "participants": [
+            {"tag": "#PLAY2", "fame": 2400, "decksUsed": 16},
+        ]}}]},
+    ]})
+    for path in list(app["responses"]):
+        app["delays"][path] = 0.1
+
+    started = time.monotonic()
+    dossier = await client.player_dossier("play2", clan_hint="#clan2")
+    assert time.monotonic() - started < 0.18  # player and clan fetched side by side
+    assert dossier.war_stats() == (1200, 8, 2400, 16)
+
+    # A wrong guess still ends with the player's actual clan.
+    dossier = await client.player_dossier("PLAY2", clan_hint="WR0NG")
+    assert dossier.clan.tag == "CLAN2"
+
+
+async def test_player_dossier_wrong_guess_costs_one_request_per_part(api):
+    app, client = api
+    app["responses"]["/players/%23PLAY3"] = (200, {"name": "Cy", "clan": {"tag": "#CLAN3", "name": "Clan"}})
+    app["responses"]["/clans/%23CLAN3/currentriverrace"] = (200, {"clan": {"participants": []}})
+    app["responses"]["/clans/%23CLAN3/riverracelog"] = (200, {"items": []})
+    app["delays"]["/clans/%23GUESS3/currentriverrace"] = 0.2
+    app["delays"]["/clans/%23GUESS3/riverracelog"] = 0.2
+
+    dossier = await client.player_dossier("PLAY3", clan_hint="GUESS3")
+    assert dossier.clan.tag == "CLAN3"
+    await asyncio.sleep(0.3)  # the abandoned guess's requests still finish upstream...
+    await client.player_dossier("PLAY3", clan_hint="GUESS3")
+    assert app["hits"] == {  # ...and are cached (as 404s here), so a second wrong guess is free
+        "/players/%23PLAY3": 1,
+        "/clans/%23CLAN3/currentriverrace": 1,
+        "/clans/%23CLAN3/riverracelog": 1,
+        "/clans/%23GUESS3/currentriverrace": 1,
+        "/clans/%23GUESS3/riverracelog": 1,
+    }
@@ -0,0 +1,50 @@
+import asyncio
+
+from services.ratelimit import Priority, TokenBucket, parse_retry_after, request_priority
+
+
+async def test_token_bucket_spaces_requests():
+    bucket = TokenBucket(rate=50, capacity=1)
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    for _ in range(4):
+        await bucket.acquire()
+    # First token is free (full bucket); the next three wait ~1/50s each.
+    assert loop.time() - start >= 0.05
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("3", 1.0) == 3.0
+    assert parse_retry_after(None, 1.0) == 1.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT", 1.0) == 1.0
+
+
+async def test_token_bucket_serves_higher_lanes_first():
+    bucket = TokenBucket(rate=100, capacity=1)
+    await bucket.acquire()  # drain the burst so the next waiters queue
+    order = []
+
+    async def take(priority, label):
+        await bucket.acquire(priority)
+        order.append(label)
+
+    await asyncio.gather(
+        take(Priority.BACKGROUND, "poll-1"),
+        take(Priority.BACKGROUND, "poll-2"),
+        take(Priority.SCHEDULED, "reminder"),
+        take(Priority.INTERACTIVE, "command"),
+    )
+    assert order == ["command", "reminder", "poll-1", "poll-2"]
+
+    stats = bucket.stats()
+    assert stats[Priority.BACKGROUND].served == 2
+    assert stats[Priority.BACKGROUND].queued == 0
+    assert stats[Priority.BACKGROUND].max_wait >= stats[Priority.INTERACTIVE].max_wait
+
+
+async def test_request_priority_sets_default_lane():
+    bucket = TokenBucket(rate=100)
+    with request_priority(Priority.BACKGROUND):
+        await bucket.acquire()
+    assert bucket.stats()[Priority.BACKGROUND].served == 1
+    assert bucket.stats()[Priority.INTERACTIVE].served == 0
@@ -1,4 +1,14 @@
-from cogs.reminders import format_reminder, local_label, war_day_sort_key, war_day_totals, war_day_utc_hours
+from types import SimpleNamespace
+
+from cogs.reminders import (
+    RemindersCog,
+    format_reminder,
+    local_label,
+    war_day_sort_key,
+    war_day_totals,
+    war_day_utc_hours,
+)
+from services.schemas import Clan, RaceParticipant, RiverRace
 
 
 def test_war_day_utc_hours():
@@ -23,9 +33,9 @@ def test_local_label():
 
 def test_war_day_totals():
     participants = {
-        "AAA": {"decksUsedToday": 4},
-        "BBB": {"decksUsedToday": 1},
-        "CCC": {"decksUsedToday": 0},
+        "AAA": RaceParticipant(tag="#AAA", decks_used_today=4),
+        "BBB": RaceParticipant(tag="#BBB", decks_used_today=1),
+        "CCC": RaceParticipant(tag="#CCC", decks_used_today=0),
     }
     assert war_day_totals(participants) == (195, 48)
 
@@ -48,3 +58,24 @@ def test_format_reminder():
     assert "**__3 Attacks__**" not in text  # empty groups are omitted
     assert "- <@615847224768856074> (ŁoştŁęgęnd)" in text
     assert text.index("**__4 Attacks__**") < text.index("**__1 Attack__**")
+
+
+class FakeClashRoyale:
+    def __init__(self, race: RiverRace | None):
+        self.race = race
+        self.calls: list[str] = []
+
+    async def current_river_race(self, clan_tag: str) -> RiverRace | None:
+        self.calls.append("race")
+        return self.race
+
+    async def clan(self, clan_tag: str) -> Clan:
+        self.calls.append("clan")
+        return Clan(tag=f"#{clan_tag}", name="Highlanders")
+
+
+async def test_no_clan_request_without_a_war_day():
+    for race in (None, RiverRace(period_type="training")):
+        cr = FakeClashRoyale(race)
+        assert await RemindersCog(SimpleNamespace(cr=cr)).build_reminder_message("P2YL9Q") is None
+        assert cr.calls == ["race"]
@@ -0,0 +1,71 @@
+from types import SimpleNamespace
+
+import pytest
+
+from cogs.resolvers import resolve_clan_tag, resolve_player_tag
+from errors import InvalidClanTag, InvalidPlayerTag
+from services.tag_memo import TagMemo
+
+
+class FakeRepo:
+    def __init__(self, nicknames: dict[str, str]):
+        self.nicknames = nicknames
+        self.lookups = 0
+
+    async def clan_tag_for_nickname(self, nickname: str, guild_id: int) -> str | None:
+        self.lookups += 1
+        return self.nicknames.get(nickname.lower())
+
+
+class FakeClashRoyale:
+    def __init__(self, existing: set[str]):
+        self.existing = existing
+        self.checks = 0
+
+    async def clan_exists(self, clan_tag: str) -> bool:
+        self.checks += 1
+        return clan_tag in self.existing
+
+
+def interaction_for(repo: FakeRepo, cr: FakeClashRoyale, memo: TagMemo, guild_id: int = 1):
+    client = SimpleNamespace(repo=repo, cr=cr, tag_memo=memo)
+    return SimpleNamespace(client=client, guild=SimpleNamespace(id=guild_id))
+
+
+async def test_resolved_nicknames_and_tags_are_remembered():
+    repo, cr, memo = FakeRepo({"hl": "P2YL9Q"}), FakeClashRoyale({"P2YL9Q"}), TagMemo(ttl=60)
+    interaction = interaction_for(repo, cr, memo)
+
+    for value in ("HL", "hl", "#p2yl9q"):
+        assert await resolve_clan_tag(interaction, value) == "P2YL9Q"
+    assert repo.lookups == 1  # nicknames match case-insensitively
+    assert cr.checks == 1
+
+    with pytest.raises(InvalidClanTag):
+        await resolve_clan_tag(interaction, "nope")
+    with pytest.raises(InvalidClanTag):
+        await resolve_clan_tag(interaction, "NOPE")
+    assert repo.lookups == 2  # "no such nickname" is remembered too
+
+
+async def test_forget_guild_drops_only_that_guilds_nicknames():
+    repo, cr, memo = FakeRepo({"hl": "P2YL9Q"}), FakeClashRoyale({"P2YL9Q", "GRJ289"}), TagMemo(ttl=60)
+    await resolve_clan_tag(interaction_for(repo, cr, memo, guild_id=1), "hl")
+    await resolve_clan_tag(interaction_for(repo, cr, memo, guild_id=2), "hl")
+
+    repo.nicknames["hl"] = "GRJ289"  # /nicklink in guild 1
+    memo.forget_guild(1)
+    assert await resolve_clan_tag(interaction_for(repo, cr, memo, guild_id=1), "hl") == "GRJ289"
+    assert memo.nickname(2, "hl") == "P2YL9Q"
+
+
+async def test_impossible_tags_are_rejected_without_a_lookup():
+    repo, cr, memo = FakeRepo({}), FakeClashRoyale(set()), TagMemo(ttl=60)
+    interaction = interaction_for(repo, cr, memo)
+
+    with pytest.raises(InvalidClanTag):
+        await resolve_clan_tag(interaction, "#HELLO!")
+    with pytest.raises(InvalidPlayerTag):
+        await resolve_player_tag(interaction, "#ABC123")
+    assert cr.checks == 0
+    assert await resolve_player_tag(interaction, "#pyl9") == "PYL9"
@@ -0,0 +1,33 @@
+import time
+
+from db.response_cache import ResponseCache
+
+
+async def test_disk_cache_evicts_oldest_by_size(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.db"), max_bytes=250)
+    await cache.connect()
+    now = time.time()
+    for i in range(3):
+        await cache.put(f"key{i}", b"x" * 100, fetched_at=now + i, expires_at=now + 60)
+
+    assert cache.total_bytes <= 250
+    assert await cache.get("key0") is None  # oldest fetch dropped first
+    assert (await cache.get("key2")).body == b"x" * 100
+
+    await cache.put("expired", b"{}", fetched_at=now - 120, expires_at=now - 60)
+    assert await cache.get("expired") is None
+    await cache.close()
+
+
+async def test_delete_drops_the_body_and_its_bytes(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.db"), max_bytes=1024)
+    await cache.connect()
+    now = time.time()
+    await cache.put("kept", b"x" * 10, fetched_at=now, expires_at=now + 60)
+    await cache.put("doomed", b"y" * 20, fetched_at=now, expires_at=now + 60)
+
+    await cache.delete("doomed")
+    await cache.delete("never-stored")
+    assert await cache.get("doomed") is None
+    assert cache.total_bytes == 10
+    await cache.close()
@@ -0,0 +1,12 @@
+from services.retry import LatencyTracker
+
+
+def test_latency_tracker_percentile_over_window():
+    tracker = LatencyTracker(window=10, min_samples=5)
+    for seconds in range(4):
+        tracker.observe(seconds)
+    assert tracker.percentile(0.95) is None
+    for seconds in range(4, 30):
+        tracker.observe(seconds)
+    assert tracker.percentile(0.95) == 29  # only the last 10 (20..29) count
+    assert tracker.percentile(0.0) == 20
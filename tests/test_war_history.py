@@ -1,5 +1,9 @@
-from services.clash_royale import ClanMember, WarHistory, former_member_tags, race_participants
+import msgspec
+
+from services.clash_royale import ClanMember, MemberWarStats, WarHistory, former_member_tags, race_participants
+from services.schemas import RaceLogItem, RiverRace
 from services.scoring import score_members
+from services.tags import is_valid_tag, normalize_tag
 
 
 def log_item(season: int, section: int, participants: list[dict]) -> dict:
@@ -21,7 +25,7 @@ def make_history() -> WarHistory:
         log_item(10, 2, [player("AAA", 3000)]),                                # 1 war ago (newest)
         log_item(10, 0, [player("AAA", 1000), player("BBB", 500)]),            # 3 wars ago
     ]
-    return WarHistory(items)
+    return WarHistory(msgspec.convert(items, list[RaceLogItem]))
 
 
 def test_ordering_and_fame():
@@ -30,11 +34,20 @@ def test_ordering_and_fame():
     assert history.fame("AAA", 1) == 3000
     assert history.fame("AAA", 2) == 2000
     assert history.fame("AAA", 3) == 1000
-    assert history.fame("#aaa", 1) == 3000  # normalization
+    assert history.fame(normalize_tag("#aaa"), 1) == 3000  # lookups take canonical tags
     assert history.fame("AAA", 4) == 0  # out of range
     assert history.fame("ZZZ", 1) == 0  # unknown player
 
 
+def test_tags_are_canonical_and_interned():
+    tag = normalize_tag(" #p2yl9q0o ")
+    assert tag == "P2YL9Q00"
+    assert normalize_tag("".join(["#", "P2YL9Q00"])) is tag  # same object whichever way it came in
+    assert is_valid_tag(tag)
+    assert not is_valid_tag(normalize_tag("#ABC123"))  # A, B, 1, 3 never appear in real tags
+    assert not is_valid_tag(normalize_tag("#"))
+
+
 def test_weeks_in_clan_requires_consecutive_presence():
     history = make_history()
     assert history.weeks_in_clan("AAA") == 3
@@ -44,21 +57,57 @@ def test_weeks_in_clan_requires_consecutive_presence():
     assert not history.is_new_member("AAA")
 
 
+def test_history_indexes_only_its_own_clan():
+    item = {"seasonId": 10, "sectionIndex": 1, "standings": [
+        {"clan": {"tag": "#RIVAL", "participants": [player("BBB", 900)]}},
+        {"clan": {"tag": "#HQME", "participants": [player("AAA", 3000)]}},
+    ]}
+    history = WarHistory(msgspec.convert([item], list[RaceLogItem]), clan_tag="#hqme")
+
+    assert history.participants(1).keys() == {"AAA"}
+    assert history.weeks_in_clan("BBB") == 0  # a rival's tag doesn't count as tenure
+    assert history.race_standings(1)["RIVAL"]["BBB"].fame == 900
+    assert history.race_standings(2) == {}
+
+
 def test_average_fame():
     history = make_history()
     assert history.average_fame("AAA") == (3000 + 2000 + 1000) / 3
     assert history.average_fame("BBB") == 0.0
 
 
+def test_whole_clan_lookups_match_per_member_ones():
+    history = make_history()
+    tags = ["AAA", "BBB", "ZZZ"]
+
+    assert history.weeks_in_clan_of(tags).tolist() == [3, 0, 0]
+    assert history.average_fame_of(tags).tolist() == [2000.0, 0.0, 0.0]
+    assert history.fame_matrix(tags, 4).tolist() == [[3000, 2000, 1000, 0], [0, 1000, 500, 0], [0, 0, 0, 0]]
+    assert history.fame_history("BBB", 3) == [0, 1000, 500]
+    assert history.decks_used("AAA", 1) == 4
+    assert history.weeks_in_clan_of([]).tolist() == []
+    assert WarHistory([]).average_fame("AAA") == 0.0
+
+
+def test_member_aggregates_are_precomputed():
+    history = make_history()
+    assert history.stats("AAA") == MemberWarStats(weeks=3, fame=6000, average_fame=2000.0, decks_used=12,
+                                                  first_war=3, last_war=1)
+    assert history.stats("BBB") == MemberWarStats(weeks=0, fame=1500, average_fame=0.0, decks_used=8,
+                                                  first_war=3, last_war=2)
+    assert history.stats("ZZZ") == MemberWarStats(0, 0, 0.0, 0, 0, 0)
+    assert WarHistory([]).stats("AAA").weeks == 0
+
+
 def test_race_participants_and_former_members():
-    race = {"clan": {"participants": [
+    race = msgspec.convert({"clan": {"participants": [
         {"tag": "#AAA", "name": "name-AAA", "fame": 100, "decksUsed": 2},
         {"tag": "#LEFT99", "name": "Ghost", "fame": 50, "decksUsed": 1},
-    ]}}
+    ]}}, RiverRace)
     members = [ClanMember("AAA", "name-AAA", "member")]
 
     participants = race_participants(race)
-    assert participants["AAA"]["fame"] == 100
+    assert participants["AAA"].fame == 100
     assert former_member_tags(race, members) == {"LEFT99": "Ghost"}
     assert race_participants(None) == {}
 
@@ -78,3 +127,12 @@ def test_scoring_marks_new_members_unscorable():
     # Fame rises toward the present => positive trend => slope score above neutral 10.
     assert aaa.slope_score > 10
     assert aaa.total == aaa.fame_score + aaa.slope_score + aaa.weeks
+
+
+def test_models_are_slot_based():
+    race = msgspec.convert({"clan": {"participants": [{"tag": "#AAA", "boatAttacks": 2}]}}, RiverRace)
+    participant = race_participants(race)["AAA"]
+    assert participant.boat_attacks == 2
+    score = score_members([ClanMember("AAA", "name", "member")], make_history())[0]
+    for model in (participant, ClanMember("AAA", "name", "member"), score):
+        assert not hasattr(model, "__dict__")
@@ -1,3 +1,5 @@
+from datetime import datetime
+
 import discord
 
 EMBED_COLOR = 0x1E133E
@@ -13,6 +15,15 @@ def make_embed(title: str, description: str = "", color: int = EMBED_COLOR) -> d
     return discord.Embed(title=title, description=description, color=color)
 
 
+def add_as_of_note(embed: discord.Embed, as_of: datetime | None) -> discord.Embed:
+    """Footer note for embeds built from cached data that is being refreshed (no-op if ``as_of`` is None)."""
+    if as_of is None:
+        return embed
+    note = f"Clash Royale data as of {as_of:%H:%M} UTC; refreshing in the background."
+    embed.set_footer(text=f"{embed.footer.text}\n{note}" if embed.footer.text else note)
+    return embed
+
+
 def excel_like_sort_key(s: str) -> str:
     """Case/character-insensitive sort key matching spreadsheet ordering."""
     return "".join(f"{ord(c):04}" for c in s.strip().lower())